@@ -1,14 +1,17 @@
 from .builder import (Pypher, _PREDEFINED_STATEMENTS, _PREDEFINED_FUNCTIONS,
     Anon, __, create_statement, create_function, RELATIONSHIP_DIRECTIONS,
-    Param)
+    Param, Compiled, Template, UNBOUND, BUDGET)
+from .batch import UnwindBatch
 from .exception import (PypherException, PypherAliasException,
-    PypherArgumentException)
+    PypherArgumentException, PypherBudgetException, PypherBudgetWarning)
 from .version import __version__
 
 
 _all = ['Pypher', 'Anon', '__', 'PypherException', 'PypherAliasException',
-    'PypherArgumentException', 'create_function', 'create_statement',
-    'RELATIONSHIP_DIRECTIONS']
+    'PypherArgumentException', 'PypherBudgetException', 'PypherBudgetWarning',
+    'BUDGET', 'create_function', 'create_statement',
+    'RELATIONSHIP_DIRECTIONS', 'Param', 'Compiled', 'Template', 'UNBOUND',
+    'UnwindBatch']
 
 
 for ps in _PREDEFINED_STATEMENTS:
@@ -0,0 +1,239 @@
+"""
+asyncio integration. Queries are compiled without blocking the event loop
+and run through a QueryExecutor, a small interface that wraps whatever async
+driver is used. This module requires Python 3.6 or newer.
+"""
+import asyncio
+
+from collections import deque
+
+from .builder import Pypher
+from .exception import PypherArgumentException
+from .parallel import compile_item
+
+try:
+    _running_loop = asyncio.get_running_loop
+except AttributeError:
+    # python 3.6 does not have get_running_loop, inside of a coroutine
+    # get_event_loop returns the loop that is running it
+    _running_loop = asyncio.get_event_loop
+
+DEFAULT_CONCURRENCY = 10
+LARGE_QUERY_LINKS = 50
+
+
+def is_large(item, limit=None):
+    """
+    Function used to check if an item should be compiled in an executor
+    instead of on the event loop. Pypher instances are large when their
+    chain has at least limit links, Partials and callables are always
+    considered large because they have to be built first.
+
+    :param item: a Pypher instance, a Partial, or a callable
+    :param int limit: the number of links, defaults to LARGE_QUERY_LINKS
+    :return: bool
+    """
+    if not isinstance(item, Pypher):
+        return True
+
+    limit = LARGE_QUERY_LINKS if limit is None else limit
+
+    for count, link in enumerate(item.iter_links(), 1):
+        if count >= limit:
+            return True
+
+    return False
+
+
+async def compile_async(item, executor=None, large_query=None):
+    """
+    Coroutine used to compile an item without blocking the event loop. Small
+    Pypher instances are compiled directly, anything else is compiled in
+    the executor. See compile_item for the items that are accepted.
+
+    :param item: a Pypher instance, a Partial, or a callable
+    :param executor: a concurrent.futures executor, defaults to the loop's
+        default executor
+    :param int large_query: the number of links that makes a Pypher instance
+        large, defaults to LARGE_QUERY_LINKS
+    :return: the compiled query
+    :rtype: Compiled
+    """
+    if not is_large(item, large_query):
+        return compile_item(item)
+
+    loop = _running_loop()
+
+    return await loop.run_in_executor(executor, compile_item, item)
+
+
+class QueryExecutor(object):
+    """
+    The interface between a Pipeline and a database driver. Sub-classes
+    define a run coroutine that sends a single compiled query:
+
+        class SessionExecutor(QueryExecutor):
+
+            def __init__(self, driver):
+                self.driver = driver
+
+            async def run(self, cypher, params):
+                async with self.driver.session() as session:
+                    result = await session.run(cypher, params)
+
+                    return await result.data()
+    """
+
+    async def run(self, cypher, params):
+        raise NotImplementedError('QueryExecutor classes need a run method')
+
+
+class MemoryExecutor(QueryExecutor):
+    """
+    A QueryExecutor that does not connect to anything. Every query that is
+    run is recorded in the queries list, it can be used to test and
+    benchmark a Pipeline without a database.
+
+    :param float delay: the number of seconds that each run waits for,
+        simulates the round trip to the database
+    :param callable result: a callable that is given the cypher and params
+        of each query and returns its result, defaults to returning None
+    """
+
+    def __init__(self, delay=0, result=None):
+        self.delay = delay
+        self.result = result
+        self.queries = []
+        self.in_flight = 0
+        self.max_in_flight = 0
+
+    async def run(self, cypher, params):
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+
+        try:
+            await asyncio.sleep(self.delay)
+            self.queries.append((cypher, dict(params)))
+
+            return self.result(cypher, params) if self.result else None
+        finally:
+            self.in_flight -= 1
+
+
+class Pipeline(object):
+    """
+    This object runs queries through a QueryExecutor with at most
+    concurrency of them in flight at once. Each query is compiled with
+    compile_async, large ones in an executor, and sent as soon as a slot is
+    free:
+
+        pipeline = Pipeline(SessionExecutor(driver), concurrency=20)
+
+        async for result in pipeline.run(items):
+            ...
+
+    submit waits for a free slot before it starts a query, so a producer
+    that submits faster than the database answers is slowed down to its
+    pace instead of queueing every query in memory.
+
+    :param QueryExecutor executor: the executor that runs the queries
+    :param int concurrency: the max number of queries in flight
+    :param compile_executor: the concurrent.futures executor that large
+        queries are compiled in, defaults to the loop's default executor
+    :param int large_query: the number of links that makes a Pypher instance
+        large, defaults to LARGE_QUERY_LINKS
+    """
+
+    def __init__(self, executor, concurrency=None, compile_executor=None,
+                 large_query=None):
+        concurrency = concurrency or DEFAULT_CONCURRENCY
+
+        if concurrency < 1:
+            error = ('The concurrency: {} must be at least'
+                ' 1'.format(concurrency))
+
+            raise PypherArgumentException(error)
+
+        self.executor = executor
+        self.concurrency = concurrency
+        self.compile_executor = compile_executor
+        self.large_query = large_query
+        self._semaphore = None
+
+    @property
+    def semaphore(self):
+        # created on first use so that it belongs to the running loop
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self.concurrency)
+
+        return self._semaphore
+
+    async def execute(self, item):
+        """
+        Coroutine used to compile and run a single item right away, it does
+        not wait for a free slot.
+
+        :param item: a Pypher instance, a Partial, or a callable
+        :return: the result of the executor
+        """
+        cypher, params = await compile_async(item, self.compile_executor,
+            self.large_query)
+
+        return await self.executor.run(cypher, params)
+
+    async def submit(self, item):
+        """
+        Coroutine used to start a query once there is a free slot.
+
+        :param item: a Pypher instance, a Partial, or a callable
+        :return: a task that resolves to the result of the executor
+        :rtype: asyncio.Task
+        """
+        semaphore = self.semaphore
+
+        await semaphore.acquire()
+
+        try:
+            task = asyncio.ensure_future(self.execute(item))
+        except BaseException:
+            semaphore.release()
+
+            raise
+
+        task.add_done_callback(lambda task: semaphore.release())
+
+        return task
+
+    async def run(self, items):
+        """
+        Async generator used to run every item and yield the results in the
+        same order as the items. Iterating over items is paused while
+        concurrency queries are in flight or waiting to be yielded.
+
+        :param items: an iterable of Pypher instances, Partials, or callables
+        :return: an async generator of results
+        """
+        pending = deque()
+
+        try:
+            for item in items:
+                if len(pending) >= self.concurrency:
+                    yield await pending.popleft()
+
+                pending.append(await self.submit(item))
+
+            while pending:
+                yield await pending.popleft()
+        finally:
+            for task in pending:
+                task.cancel()
+
+    async def run_all(self, items):
+        """
+        Coroutine used to run every item and collect the results.
+
+        :param items: an iterable of Pypher instances, Partials, or callables
+        :return: the results in the same order as the items
+        :rtype: list
+        """
+        return [result async for result in self.run(items)]
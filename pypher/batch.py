@@ -0,0 +1,98 @@
+from itertools import islice
+
+from .builder import Pypher, Param
+from .exception import PypherArgumentException
+
+
+class UnwindBatch(object):
+    """
+    This object is used to write large amounts of rows with a single query.
+    The rows are split into chunks and each chunk is bound as a list param
+    that is unwound at the start of the query:
+
+        UNWIND $rows AS row <the rest of the query>
+
+    The query is built and rendered only once, iterating over the batch
+    lazily yields a (cypher, params) pair for every chunk:
+
+        def build(pypher, alias):
+            pypher.MERGE.node('u', 'User', id=__.row.__id__)
+            pypher.SET.u += __.row
+
+        batch = UnwindBatch(rows, build, chunk_size=500)
+
+        for cypher, params in batch:
+            session.run(cypher, params)
+
+    The rest of the query can either be defined by passing in a callable or by
+    sub-classing and defining a build method.
+
+    :param rows: an iterable of row dicts, it is consumed lazily
+    :param callable build: a callable that is given the Pypher instance, after
+        the UNWIND statement was added, and the alias of the current row
+    :param int chunk_size: the max number of rows that are bound to a query
+    :param str param: the name of the param that holds the rows
+    :param str alias: the name that each row is unwound as
+    """
+    DEFAULT_CHUNK_SIZE = 1000
+
+    def __init__(self, rows, build=None, chunk_size=None, param='rows',
+                 alias='row'):
+        if chunk_size is None:
+            chunk_size = self.DEFAULT_CHUNK_SIZE
+
+        if chunk_size < 1:
+            error = 'The chunk_size: {} must be at least 1'.format(chunk_size)
+
+            raise PypherArgumentException(error)
+
+        self.rows = rows
+        self.chunk_size = chunk_size
+        self.param = param
+        self.alias = alias
+        self._build = build
+        self._template = None
+
+    def build(self, pypher, alias):
+        if not self._build:
+            raise NotImplementedError('UnwindBatch needs a build callable or'
+                ' a build method')
+
+        self._build(pypher, alias)
+
+    def _get_template(self):
+        if not self._template:
+            pypher = Pypher()
+            pypher.UNWIND(Param(self.param)).AS(self.alias)
+            self.build(pypher, self.alias)
+            self._template = pypher.template()
+
+        return self._template
+
+    template = property(_get_template)
+
+    @property
+    def cypher(self):
+        return self.template.cypher
+
+    def chunks(self):
+        """
+        Generator used to split the rows into lists of at most chunk_size rows.
+
+        :return: a generator of lists
+        """
+        rows = iter(self.rows)
+
+        while True:
+            chunk = list(islice(rows, self.chunk_size))
+
+            if not chunk:
+                return
+
+            yield chunk
+
+    def __iter__(self):
+        template = self.template
+
+        for chunk in self.chunks():
+            yield template.cypher, template.bind(**{self.param: chunk})
@@ -0,0 +1,456 @@
+"""
+Micro-benchmarks for the hot paths of the Cypher builder.
+
+Every case is run at several sizes and each result is written out as a line
+of JSON so that runs can be compared against each other:
+
+    python -m pypher.benchmark
+    python -m pypher.benchmark --sizes 10,100,1000 --repeat 5 --case render
+"""
+import argparse
+import contextlib
+import functools
+import json
+import os
+import subprocess
+import sys
+import threading
+import timeit
+
+from collections import OrderedDict
+
+from . import builder
+from .batch import UnwindBatch
+from .builder import Pypher, Params, __, create_function
+from .parallel import compile_many
+from .partial import Case
+
+
+DEFAULT_SIZES = [10, 100, 1000]
+DEFAULT_REPEAT = 5
+CASES = OrderedDict()
+
+
+def case(name):
+    """
+    Decorator used to register a benchmark case. The decorated function is
+    given the size of the run and must return a (setup, run) pair of
+    callables. setup is called before every timed run and its return value is
+    passed to run, only run is timed.
+    """
+    def register(fn):
+        CASES[name] = fn
+
+        return fn
+
+    return register
+
+
+@contextlib.contextmanager
+def _scratch_registry(name):
+    """
+    Context manager used to register link classes for a benchmark without
+    keeping them. When the benchmark is done the class that is registered
+    under the name, and its aliases, are removed from a copy of the registry
+    along with the module attributes. Any other class that was registered
+    while it ran, like the predefined classes that are created when they are
+    first used, is kept.
+
+    :param str name: the name of the classes that the benchmark creates
+    """
+    try:
+        yield
+    finally:
+        with builder._REGISTRY_LOCK:
+            links = dict(builder._LINKS)
+            cls = links.pop(name.lower(), None)
+
+            for key in [k for k, v in links.items() if v is cls]:
+                del links[key]
+
+            builder._LINKS = links
+            builder._RESOLVED = {}
+            builder.__dict__.pop(name, None)
+
+            if name in builder.__all__:
+                builder.__all__.remove(name)
+
+
+_IMPORT = '''
+import sys
+
+for _ in range({size}):
+    for name in [m for m in sys.modules if m.split('.')[0] == 'pypher']:
+        del sys.modules[name]
+
+    import pypher
+'''
+
+
+def _chain(size):
+    p = Pypher()
+
+    for i in range(size):
+        p.link('s{}'.format(i))
+
+    return p
+
+
+def _query(size):
+    p = Pypher()
+
+    for i in range(size):
+        p.MATCH.node('n{}'.format(i), 'Label', id=i)
+        p.WHERE.n.__name__ == 'name {}'.format(i)
+
+    p.RETURN.n
+
+    return p
+
+
+def _build_user(user_id, pypher):
+    pypher.MATCH.node('u', 'User', id=user_id)
+    pypher.WHERE.u.__name__ == 'name {}'.format(user_id)
+    pypher.RETURN.u
+
+
+@case('add_link')
+def add_link(size):
+    def run(state):
+        _chain(size)
+
+    return None, run
+
+
+@case('import')
+def import_pypher(size):
+    # the package is imported size times in a new interpreter, the modules
+    # that it depends on are only imported the first time
+    path = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    env = dict(os.environ)
+    env['PYTHONPATH'] = os.pathsep.join(p for p in [path,
+        env.get('PYTHONPATH')] if p)
+    command = [sys.executable, '-c', _IMPORT.format(size=size)]
+
+    def run(state):
+        subprocess.check_call(command, env=env)
+
+    return None, run
+
+
+@case('getattr')
+def getattr_chain(size):
+    def run(state):
+        p = Pypher()
+
+        for i in range(size):
+            p.MATCH.n.WHERE.n.__name__.IS_NOT.NULL.RETURN.n.__id__
+
+    return None, run
+
+
+@case('render')
+def render(size):
+    def setup():
+        return _query(size)
+
+    def run(p):
+        str(p)
+
+    return setup, run
+
+
+@case('render_cached')
+def render_cached(size):
+    def setup():
+        p = _query(size)
+        str(p)
+
+        return p
+
+    def run(p):
+        str(p)
+        p.bound_params
+
+    return setup, run
+
+
+@case('bind_param')
+def bind_param(size):
+    def setup():
+        return Params(prefix=Pypher.PARAM_PREFIX)
+
+    def run(params):
+        for i in range(size):
+            params.bind_param(i)
+
+    return setup, run
+
+
+@case('params_merge')
+def params_merge(size):
+    def setup():
+        parent = Params(prefix=Pypher.PARAM_PREFIX)
+        parent.bind_params(range(size))
+        children = []
+
+        for i in range(10):
+            child = Params(prefix=Pypher.PARAM_PREFIX)
+            child.bind_params(range(i * size, (i + 1) * size))
+            children.append(child)
+
+        return parent, children
+
+    def run(state):
+        parent, children = state
+
+        for child in children * 2:
+            parent.merge(child)
+
+    return setup, run
+
+
+@case('node_properties')
+def node_properties(size):
+    properties = dict(('prop{}'.format(i), i) for i in range(size))
+
+    def setup():
+        p = Pypher()
+        p.MERGE.node('n', 'Label', **properties)
+
+        return p
+
+    def run(p):
+        str(p)
+
+    return setup, run
+
+
+@case('relationship_properties')
+def relationship_properties(size):
+    properties = dict(('prop{}'.format(i), i) for i in range(size))
+
+    def setup():
+        p = Pypher()
+        p.MATCH.node('a').rel_out('r', 'TYPE', **properties).node('b')
+
+        return p
+
+    def run(p):
+        str(p)
+
+    return setup, run
+
+
+@case('map_nested')
+def map_nested(size):
+    values = dict(('key{}'.format(i), [i, 'value {}'.format(i)])
+        for i in range(size))
+
+    def setup():
+        p = Pypher()
+        p.RETURN.map('one', **values)
+        p.SET.n += {'nested': values}
+
+        return p
+
+    def run(p):
+        str(p)
+
+    return setup, run
+
+
+@case('clone')
+def clone(size):
+    def setup():
+        return _query(size)
+
+    def run(p):
+        p.clone()
+
+    return setup, run
+
+
+@case('fingerprint')
+def fingerprint(size):
+    def run(state):
+        p = Pypher()
+
+        for i in range(size):
+            p.MATCH.node('n{}'.format(i), 'Label', id=i)
+            p.fingerprint
+
+    return None, run
+
+
+@case('partial_case')
+def partial_case(size):
+    def setup():
+        case = Case(__.n.__eyes__)
+
+        for i in range(size):
+            case.WHEN('"{}"'.format(i), i)
+
+        case.ELSE(-1)
+        p = Pypher()
+        p.RETURN(case)
+
+        return p
+
+    def run(p):
+        str(p)
+
+    return setup, run
+
+
+@case('threads')
+def threads(size, workers=8):
+    shared = __.n.__name__ == 'shared'
+    name = 'pypher_bench_func'
+
+    def build(worker):
+        for i in range(size):
+            p = Pypher()
+            p.MATCH.node('n', 'User', id=i).WHERE(shared)
+            getattr(p.RETURN, name)(__.n, worker)
+            p.compile()
+
+    def register():
+        for i in range(size):
+            create_function(name, {'name': 'bench_{}'.format(i % 2)})
+
+    def run(state):
+        pool = [threading.Thread(target=build, args=(i,))
+            for i in range(workers)]
+        pool.append(threading.Thread(target=register))
+
+        with _scratch_registry(name):
+            for thread in pool:
+                thread.start()
+
+            for thread in pool:
+                thread.join()
+
+    return None, run
+
+
+@case('compile_many')
+def compile_many_case(size):
+    items = [functools.partial(_build_user, i) for i in range(size)]
+
+    def run(state):
+        for compiled in compile_many(items):
+            pass
+
+    return None, run
+
+
+@case('pipeline')
+def pipeline(size, concurrency=10):
+    # asyncio needs Python 3, it is only imported when the case runs
+    import asyncio
+
+    from .aio import MemoryExecutor, Pipeline
+
+    items = [functools.partial(_build_user, i) for i in range(size)]
+
+    def run(state):
+        loop = asyncio.new_event_loop()
+
+        try:
+            executor = MemoryExecutor(delay=0.001)
+            loop.run_until_complete(Pipeline(executor,
+                concurrency=concurrency).run_all(items))
+        finally:
+            loop.close()
+
+    return None, run
+
+
+@case('unwind_batch')
+def unwind_batch(size):
+    rows = [{'id': i, 'name': 'name {}'.format(i)} for i in range(size)]
+
+    def build(pypher, alias):
+        pypher.MERGE.node('n', 'Label', id=__.row.__id__)
+        pypher.SET.n += __.row
+
+    def run(state):
+        for cypher, params in UnwindBatch(rows, build, chunk_size=100):
+            pass
+
+    return None, run
+
+
+def run_case(name, size, repeat=DEFAULT_REPEAT):
+    """
+    Function used to time a single case at a single size.
+
+    :param str name: the name of the registered case
+    :param int size: the size that is passed to the case
+    :param int repeat: the number of timed runs
+    :return: the result of the run
+    :rtype: dict
+    """
+    setup, run = CASES[name](size)
+    timings = []
+
+    for _ in range(repeat):
+        state = setup() if setup else None
+        start = timeit.default_timer()
+        run(state)
+        timings.append(timeit.default_timer() - start)
+
+    best = min(timings)
+
+    return OrderedDict([
+        ('case', name),
+        ('size', size),
+        ('repeat', repeat),
+        ('best', best),
+        ('mean', sum(timings) / len(timings)),
+        ('per_item', best / size if size else best),
+    ])
+
+
+def run(names=None, sizes=None, repeat=DEFAULT_REPEAT):
+    """
+    Generator used to run a set of cases at a set of sizes.
+
+    :param list names: the names of the cases to run, defaults to all of them
+    :param list sizes: the sizes to run each case at
+    :param int repeat: the number of timed runs for each case and size
+    :return: a generator of result dicts
+    """
+    names = names or list(CASES)
+    sizes = sizes or DEFAULT_SIZES
+
+    for name in names:
+        for size in sizes:
+            yield run_case(name, size, repeat=repeat)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Pypher micro-benchmarks')
+    parser.add_argument('--case', action='append', dest='cases',
+        choices=list(CASES), help='the case to run, can be repeated')
+    parser.add_argument('--sizes', default=','.join(map(str, DEFAULT_SIZES)),
+        help='comma separated list of sizes')
+    parser.add_argument('--repeat', type=int, default=DEFAULT_REPEAT)
+    parser.add_argument('--output', default=None,
+        help='file to write the results to, defaults to stdout')
+    args = parser.parse_args(argv)
+    sizes = [int(s) for s in args.sizes.split(',') if s]
+    output = open(args.output, 'w') if args.output else sys.stdout
+
+    try:
+        for result in run(args.cases, sizes, args.repeat):
+            output.write(json.dumps(result) + '\n')
+            output.flush()
+    finally:
+        if output is not sys.stdout:
+            output.close()
+
+
+if __name__ == '__main__':
+    main()
@@ -1,18 +1,38 @@
 import copy
+import functools
+import marshal
 import sys
-import uuid
+import threading
+import warnings
+import weakref
 
 from collections import namedtuple, OrderedDict
 
 from six import with_metaclass
 
+try:
+    from types import MappingProxyType
+except ImportError:
+    # python 2 does not have read-only dict views, a copy is used instead
+    MappingProxyType = dict
+
 from .exception import (PypherException, PypherAliasException,
-    PypherArgumentException)
+    PypherArgumentException, PypherBudgetException, PypherBudgetWarning)
 from .partial import Partial
 
 
 CHECK_CUSTOM_CLASHES = True
+DETERMINISTIC_PARAMS = False
 _LINKS = {}
+_RESOLVED = {}
+_RESOLVED_SIZE = 1024
+_setattr = object.__setattr__
+_PENDING = {}
+_PENDING_LINKS = OrderedDict()
+_REGISTRY_LOCK = threading.RLock()
+_RENDERING = threading.local()
+_PARAMS_LOCK = threading.Lock()
+_UNPICKLED_SLOTS = frozenset(['_compiled', '_fingerprint'])
 _MODULE = sys.modules[__name__]
 _PREDEFINED_STATEMENTS = [['Match',], ['Create',], ['Merge',], ['Delete',],
     ['Remove',], ['Drop',], ['Where',], ['OrderBy', 'ORDER BY'],
@@ -58,6 +78,16 @@ QUOTES = {
     'map_key': '`',
 }
 
+# limits that are checked while a query is rendered, None turns a limit off.
+# on_exceeded is either 'raise' or 'warn'
+BUDGET = {
+    'max_length': None,
+    'max_links': None,
+    'max_params': None,
+    'in_list_param': 100,
+    'on_exceeded': 'raise',
+}
+
 def quote(mark, val):
     return '{}{}{}'.format(mark, val, mark)
 
@@ -71,6 +101,198 @@ def quote_map_key(val):
     return quote(QUOTES['map_key'], val)
 
 
+def shape(value, expand=False):
+    """
+    Function used to normalize a value for a query fingerprint. Nested Pypher
+    and Partial instances are replaced with their own fingerprint, Param
+    objects with their name, and every other value with a ?.
+
+    :param value: the value to normalize
+    :param bool expand: when True lists and dicts are normalized item by item,
+        this is used where each item is bound as its own param
+    :return: the normalized value
+    :rtype: str
+    """
+    if isinstance(value, (Pypher, Partial)):
+        return '<{}>'.format(value.fingerprint)
+
+    if isinstance(value, Param):
+        return '${}'.format(value.name)
+
+    if expand:
+        if isinstance(value, dict):
+            items = ['{}: {}'.format(k, shape(v, expand=True))
+                for k, v in sorted(value.items())]
+
+            return '{{{}}}'.format(', '.join(items))
+
+        if isinstance(value, (list, set, tuple)):
+            items = [shape(v, expand=True) for v in value]
+
+            return '[{}]'.format(', '.join(items))
+
+    return '?'
+
+
+def raw_shape(value):
+    """
+    Function used to normalize a value that is written into the query as is.
+
+    :param value: the value to normalize
+    :return: the normalized value
+    :rtype: str
+    """
+    if isinstance(value, (Pypher, Partial)):
+        return shape(value)
+
+    return str(value)
+
+
+def is_plain(value):
+    """
+    Function used to check if a value can be sent to the database as is, as
+    part of a param. Pypher instances, Partials and Param objects are
+    rendered into the query instead.
+
+    :param value: the value to check
+    :return: bool
+    """
+    if isinstance(value, (list, set, tuple)):
+        return all(is_plain(v) for v in value)
+
+    return not isinstance(value, (Pypher, Partial, Param))
+
+
+def bind_map_param(link, name, values):
+    """
+    Function used to bind a dict of values as a single param, it is used by
+    the links that take a map_param argument. Their keys can then be read
+    from it, $props.key, instead of each value being its own param.
+
+    :param link: the link that the param is bound for
+    :param name: the name of the param or True to create one
+    :param dict values: the values
+    :return: the name of the param
+    :rtype: str
+    """
+    if name is True:
+        param = link.bind_param(values, link.params.param_name('props'))
+    else:
+        param = link.bind_param(Param(name, values))
+
+    return param.name
+
+
+class _Budget(object):
+    """
+    This object keeps track of the size of a query while it is rendered and
+    checks it against the BUDGET limits after every link. The links of the
+    instances that are nested in the query are counted along with its own.
+    The first limit that is exceeded raises a PypherBudgetException, or is
+    only warned about once, depending on BUDGET['on_exceeded'].
+    """
+    __slots__ = ('params', 'max_length', 'max_links', 'max_params', 'warn',
+        'length', 'links')
+
+    def __init__(self, params):
+        self.params = params
+        self.max_length = BUDGET['max_length']
+        self.max_links = BUDGET['max_links']
+        self.max_params = BUDGET['max_params']
+        self.warn = BUDGET['on_exceeded'] == 'warn'
+        self.length = 0
+        self.links = 0
+
+    @classmethod
+    def start(cls, pypher):
+        # rendering is not slowed down when every limit is off
+        if (BUDGET['max_length'] is None and BUDGET['max_links'] is None
+            and BUDGET['max_params'] is None):
+            return None
+
+        return cls(pypher.params)
+
+    def render_link(self, render, *args):
+        """
+        Method used to render a link of the query and count it along with
+        every link of the instances that are nested in it. Nested instances
+        add their links to the counter in _RENDERING, see
+        Pypher._rendered.
+
+        :param callable render: the function that renders the link
+        :return: the result of render
+        """
+        outer = getattr(_RENDERING, 'links', None)
+        _RENDERING.links = 0
+
+        try:
+            result = render(*args)
+        finally:
+            nested = _RENDERING.links
+
+            # a query that is rendered inside of another one is counted in
+            # both
+            _RENDERING.links = None if outer is None else outer + nested
+
+        self.links += 1 + nested
+
+        if self.max_links is not None and self.links > self.max_links:
+            self.exceeded('max_links', 'links', self.links)
+
+        return result
+
+    def add(self, part):
+        self.length += len(part)
+
+        if self.max_length is not None and self.length > self.max_length:
+            self.exceeded('max_length', 'characters', self.length)
+
+        if self.max_params is not None:
+            count = len(self.params._bound_params)
+
+            if count > self.max_params:
+                self.exceeded('max_params', 'params', count)
+
+    def exceeded(self, limit, unit, value):
+        message = ('The query has more than {} {} ({}), see'
+            ' BUDGET[{!r}]'.format(getattr(self, limit), unit, value, limit))
+
+        if not self.warn:
+            raise PypherBudgetException(message)
+
+        warnings.warn(message, PypherBudgetWarning, stacklevel=4)
+
+        # a limit is only warned about once per render
+        setattr(self, limit, None)
+
+
+def _slots(cls):
+    """
+    Generator used to get every slot defined by a class and its bases along
+    with its descriptor.
+
+    :param type cls: the class
+    :return: a generator of (name, descriptor) pairs
+    """
+    for klass in cls.__mro__:
+        slots = klass.__dict__.get('__slots__', ())
+
+        if isinstance(slots, str):
+            slots = (slots,)
+
+        for slot in slots:
+            yield slot, klass.__dict__[slot]
+
+
+def _instance_dict(obj):
+    # read without going through Pypher.__getattr__, links only have a
+    # __dict__ when a custom class does not define __slots__
+    try:
+        return object.__getattribute__(obj, '__dict__')
+    except AttributeError:
+        return None
+
+
 def create_function(name, attrs=None, func_raw=False):
     """
     This is a utility function that is used to dynamically create new
@@ -92,10 +314,13 @@ def create_function(name, attrs=None, func_raw=False):
         instead of a Func instance
     :return None
     """
-    attrs = attrs or {}
+    attrs = dict(attrs or {})
+    attrs.setdefault('__slots__', ())
     func = Func if not func_raw else FuncRaw
 
-    setattr(_MODULE, name, type(name, (func,), attrs))
+    with _REGISTRY_LOCK:
+        setattr(_MODULE, name, type(name, (func,), attrs))
+        _export(name)
 
 
 def create_statement(name, attrs=None):
@@ -110,9 +335,43 @@ def create_statement(name, attrs=None):
         used when the Pypher instance is converted to a string
     :return None
     """
-    attrs = attrs or {}
+    attrs = dict(attrs or {})
+    attrs.setdefault('__slots__', ())
+
+    with _REGISTRY_LOCK:
+        setattr(_MODULE, name, type(name, (Statement,), attrs))
+        _export(name)
+
+
+def _export(name):
+    # classes created after the module was imported are added to __all__ so
+    # that a star import still finds them
+    names = _MODULE.__dict__.get('__all__', None)
+
+    if names is not None and name[0] != '_' and name not in names:
+        names.append(name)
+
+
+class _Unbound(object):
+    """
+    The value of a Param that was created without one. These params are
+    filled in later with Template.bind. There is only ever one instance.
+    """
+
+    def __repr__(self):
+        return 'UNBOUND'
+
+    def __copy__(self):
+        return self
+
+    def __deepcopy__(self, memo):
+        return self
+
+    def __reduce__(self):
+        return 'UNBOUND'
 
-    setattr(_MODULE, name, type(name, (Statement,), attrs))
+
+UNBOUND = _Unbound()
 
 
 class Param(object):
@@ -123,7 +382,8 @@ class Param(object):
     :param str name: The name of the parameter that will be used in place
         of a value in the resuliting Cypher string
     :param value: The value of the parameter that is bound to the resulting
-        Cypher string
+        Cypher string. If it is omitted the param is left unbound and its
+        value must be supplied when binding a Template
     """
     __placeholder_value__ = '_____!!@@_____placeholder&&&_____@@!!____'
     nobind_mapping = {
@@ -132,24 +392,23 @@ class Param(object):
         None: 'NULL',
     }
 
-    def __init__(self, name, value):
+    def __init__(self, name, value=UNBOUND):
         self.name = name.lstrip('$')
         self.value = value
         self._placeholder = self.__placeholder_value__
 
     def get_placeholder(self):
         """will check to see if the value is one of the types that should
-        not be bound"""
+        not be bound. Reading the placeholder does not change the Param so
+        that it can be shared between threads"""
         if self._placeholder != self.__placeholder_value__:
             return self._placeholder
 
         for k, v in self.nobind_mapping.items():
             if self.value is k:
-                self._placeholder = v
-                return self._placeholder
+                return v
 
-        self._placeholder = '$' + self.name
-        return self._placeholder
+        return '$' + self.name
 
     def set_placeholder(self, value):
         self._placeholder = value
@@ -157,6 +416,45 @@ class Param(object):
     placeholder = property(get_placeholder, set_placeholder)
 
 
+class _Rendering(object):
+    """
+    The context of a render in the current thread. The Params object of the
+    query that is rendered is locked while the render runs, so that one
+    query is only rendered by one thread at a time while other queries are
+    rendered in parallel. The instances nested in the query bind their
+    params to that Params object instead of following their parent
+    attribute, which is changed by every query that they are nested in.
+    Rendering inside of a render of the same query does not lock it again.
+
+    :param Params params: the params of the query that is rendered
+    """
+    __slots__ = ('params', 'previous', 'locked')
+
+    def __init__(self, params):
+        self.params = params
+        self.previous = None
+        self.locked = False
+
+    def __enter__(self):
+        previous = getattr(_RENDERING, 'params', None)
+
+        if previous is not self.params:
+            self.params._lock.acquire()
+            self.previous = previous
+            self.locked = True
+            _RENDERING.params = self.params
+
+        return self
+
+    def __exit__(self, *exc):
+        if self.locked:
+            _RENDERING.params = self.previous
+            self.locked = False
+            self.params._lock.release()
+
+        return False
+
+
 class Params(object):
     """
     This object is used to collect Param objects that are bound to the Pypher
@@ -170,13 +468,43 @@ class Params(object):
     :param string key: a key that should be unique to each Params instance that
         will be used when Param objects are created with the bind_param method
         that do not have an existing name
+    :param bool deterministic: when True and a key is not passed in, the
+        DETERMINISTIC_KEY is used instead of a random one so that the same
+        query will always be given the same param names. Defaults to the
+        module level DETERMINISTIC_PARAMS setting
     """
+    DETERMINISTIC_KEY = 'p'
+
+    def __init__(self, prefix=None, key=None, pypher=None, deterministic=None):
+        if deterministic is None:
+            deterministic = DETERMINISTIC_PARAMS
+
+        if not key and deterministic:
+            key = self.DETERMINISTIC_KEY
 
-    def __init__(self, prefix=None, key=None, pypher=None):
         self.prefix = prefix + '_' if prefix else ''
-        self.key = key or str(uuid.uuid4())[-5:]
+        self._key = key
+        self.deterministic = deterministic
         self.pypher = pypher
         self._bound_params = {}
+        self._value_index = {}
+        self._unhashable = []
+        self._named = set()
+        self._sorted = None
+        self._version = 0
+        self._merged = None
+        self._lock = threading.RLock()
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        state['_merged'] = None
+        del state['_lock']
+
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._lock = threading.RLock()
 
     def reset(self):
         """
@@ -186,6 +514,11 @@ class Params(object):
         :return: None
         """
         self._bound_params = {}
+        self._value_index = {}
+        self._unhashable = []
+        self._named = set()
+        self._merged = None
+        self._changed()
 
     def clone(self):
         """
@@ -195,14 +528,58 @@ class Params(object):
         :return: a new instance with the same _bound_params values
         :rtype: Params
         """
-        params = Params(prefix=self.prefix, key=self.key)
-        params._bound_params = copy.deepcopy(self._bound_params)
+        params = Params(key=self.key, deterministic=self.deterministic)
+        params.prefix = self.prefix
+
+        if self._bound_params:
+            params._bound_params = copy.deepcopy(self._bound_params)
+            params._value_index = dict(self._value_index)
+            params._unhashable = list(self._unhashable)
+            params._named = set(self._named)
+            params._changed()
 
         return params
 
+    def _get_key(self):
+        # the random key is only generated when a name is first needed
+        if not self._key:
+            # uuid is slow to import and is only needed here
+            import uuid
+
+            self._key = str(uuid.uuid4())[-5:]
+
+        return self._key
+
+    def _set_key(self, key):
+        self._key = key
+
+    key = property(_get_key, _set_key)
+
     @property
     def bound_params(self):
-        return OrderedDict(sorted(self._bound_params.items()))
+        if self._sorted is None:
+            self._sorted = sorted(self._bound_params.items())
+
+        return OrderedDict(self._sorted)
+
+    @property
+    def view(self):
+        """
+        A read-only view of the bound params in the order that they were
+        bound. It is not a copy, it changes as more params are bound. Use
+        bound_params when the params have to be sorted. On Python 2 it is a
+        plain dict copy.
+
+        :return: the param name to value mapping
+        :rtype: MappingProxyType
+        """
+        return MappingProxyType(self._bound_params)
+
+    def _changed(self):
+        # the version is used by Pypher instances to know if their cached
+        # Cypher string was created against the current state of the params
+        self._sorted = None
+        self._version += 1
 
     def bind_params(self, params=None):
         if not params:
@@ -220,8 +597,9 @@ class Params(object):
     def bind_param(self, value, name=None):
         bind = True
         is_pypher = False
+        named = isinstance(value, Param)
 
-        if isinstance(value, Param):
+        if named:
             name = value.name
             value = value.value
 
@@ -232,23 +610,22 @@ class Params(object):
             bind = False
             is_pypher = True
 
-        if bind and value in self._bound_params.values():
-            for k, v in self._bound_params.items():
-                if v == value and type(v) == type(value):
-                    name = k
-                    break
-        elif bind and value in self._bound_params.keys():
-            for k, v in self._bound_params.items():
-                if k == value:
-                    name = k
-                    value = v
-                    break
+        # a value passed in as a named Param keeps its own name, it is never
+        # shared with an equal value so that it can be bound by itself
+        if bind and not named:
+            existing = self._find(value)
+
+            if existing is not None:
+                name = existing
+            elif self._is_name(value):
+                name = value
+                value = self._bound_params[name]
 
         if not name:
             name = self.param_name()
 
         param = Param(name=name, value=value)
-        self._bound_params[param.name] = param.value
+        self._store(param.name, param.value, named and bind)
 
         # if the value was a Pypher instance, we want to override the
         # .placeholder property with the resulting Cypher string and not
@@ -258,151 +635,1034 @@ class Params(object):
 
         return param
 
+    def bind_many(self, items, pypher=None):
+        """
+        Method used to bind a batch of values at once, like the properties of
+        an entity. Each item is a (name, value) pair, the name is used to
+        create the param name the same way that param_name does. Plain values
+        are looked up and stored directly, Param objects, Pypher instances,
+        and any value that needs more than that are bound with bind_param.
+
+        :param items: an iterable of (name, value) pairs
+        :param Pypher pypher: the instance that the values are bound for
+        :return: the placeholder of each value, in the same order
+        :rtype: list
+        """
+        placeholders = []
+        bound = self._bound_params
+        index = self._value_index
+        key = self.key
+        changed = False
+
+        for name, value in items:
+            param_name = None
+
+            if not isinstance(value, (Param, Pypher)) and value is not UNBOUND:
+                index_key = self._index_key(value)
+
+                if index_key is not None:
+                    param_name = index.get(index_key, None)
+
+                    # a value that is the name of a bound param reuses it, it
+                    # is left to bind_param
+                    if param_name is None and value not in bound:
+                        param_name = '{}{}_{}'.format(name or self.prefix,
+                            key, len(bound)).lstrip('$')
+
+                        if param_name in bound:
+                            param_name = None
+                        else:
+                            bound[param_name] = value
+                            index[index_key] = param_name
+                            changed = True
+
+            if param_name is None:
+                if pypher is not None:
+                    self.pypher = pypher
+
+                param = self.bind_param(value, self.param_name(name))
+                placeholders.append(param.placeholder)
+            elif value is True or value is False or value is None:
+                placeholders.append(Param.nobind_mapping[value])
+            else:
+                placeholders.append('$' + param_name)
+
+        if changed:
+            self._changed()
+
+        return placeholders
+
+    @staticmethod
+    def _index_key(value):
+        # values are indexed along with their type so that 1 and True or 1 and
+        # 1.0 are not treated as the same parameter
+        key = (type(value), value)
+
+        try:
+            hash(key)
+        except TypeError:
+            return None
+
+        return key
+
+    def _find(self, value):
+        """
+        Method used to find the name of a previously bound param that has the
+        same value and type as the one passed in. Hashable values are looked up
+        in an index, unhashable values (lists, dicts, etc.) are compared
+        against the other unhashable values that were bound.
+
+        :param value: the value to look for
+        :return: the name of the bound param or None
+        """
+        if value is UNBOUND:
+            return None
+
+        key = self._index_key(value)
+
+        if key is not None:
+            return self._value_index.get(key, None)
+
+        for name in self._unhashable:
+            bound = self._bound_params[name]
+
+            if type(bound) == type(value) and bound == value:
+                return name
+
+        return None
+
+    def _is_name(self, value):
+        try:
+            return value in self._bound_params
+        except TypeError:
+            return False
+
+    def _store(self, name, value, named=False):
+        if name in self._bound_params:
+            bound = self._bound_params[name]
+
+            if ((bound is value or (type(bound) == type(value)
+                and self._index_key(value) is not None and bound == value))
+                    and (not named or name in self._named)):
+                return
+
+            self._unindex(name, bound)
+
+        self._bound_params[name] = value
+        self._changed()
+
+        # unbound params must never be reused for one another and named params
+        # are not indexed so that other values do not reuse them
+        if named:
+            self._named.add(name)
+            return
+
+        if value is UNBOUND:
+            return
+
+        key = self._index_key(value)
+
+        if key is None:
+            self._unhashable.append(name)
+        elif key not in self._value_index:
+            self._value_index[key] = name
+
+    def _unindex(self, name, value):
+        if name in self._named:
+            self._named.discard(name)
+            return
+
+        if value is UNBOUND:
+            return
+
+        key = self._index_key(value)
+
+        if key is None:
+            self._unhashable.remove(name)
+        elif self._value_index.get(key, None) == name:
+            del self._value_index[key]
+
+            # another param may be holding the same value, the first one
+            # bound is the one that will be reused
+            for other, bound in self._bound_params.items():
+                if (other != name and other not in self._named
+                    and self._index_key(bound) == key):
+                    self._value_index[key] = other
+                    break
+
     def param_name(self, name=None):
+        # names are numbered by the size of the table, bound params are never
+        # removed individually so the count only grows until reset
         return '{}{}_{}'.format(name or self.prefix, self.key,
-            len(self.bound_params))
+            len(self._bound_params))
 
-    def __iadd__(self, other):
-        self.bind_params(other.bound_params)
+    def merge(self, other):
+        """
+        Method used to import all of the bound params of another Params object
+        in a single pass. Values that are already bound keep their existing
+        name. Merging the same Params object again, without it binding any new
+        params in the meantime, does nothing.
+
+        :param Params other: the Params object to import
+        :return: the current instance
+        :rtype: Params
+        """
+        if other is self or not other._bound_params:
+            return self
+
+        if self._merged is None:
+            self._merged = weakref.WeakKeyDictionary()
+        elif self._merged.get(other, None) == other._version:
+            return self
+
+        if not self._bound_params:
+            self._bound_params = dict(other._bound_params)
+            self._value_index = dict(other._value_index)
+            self._unhashable = list(other._unhashable)
+            self._named = set(other._named)
+            self._changed()
+        else:
+            # both instances generate names the same way (deterministic
+            # params), a generated name that is already used for another value
+            # is given a new one instead of overwriting it
+            same_key = other._key is not None and other._key == self._key
+
+            for name, value in other._bound_params.items():
+                named = name in other._named
+                existing = None if named else self._find(value)
+
+                if existing is not None:
+                    name = existing
+                elif (same_key and name in self._bound_params
+                      and self._bound_params[name] is not value):
+                    name = self.param_name().lstrip('$')
+
+                self._store(name, value, named)
+
+        self._merged[other] = other._version
 
         return self
 
+    def __iadd__(self, other):
+        return self.merge(other)
+
+
+class Compiled(namedtuple('Compiled', ['cypher', 'params'])):
+    """
+    This object is the immutable result of compiling a Pypher instance, it
+    holds the Cypher string and a read-only snapshot of the params that were
+    bound while it was rendered:
+
+        p = Pypher()
+        p.MATCH.node('u', 'User', id=1)
+        cypher, params = p.compile()
+
+    It can be passed to a driver as is, the params will not change if the
+    Pypher instance is changed and compiled again.
+
+    Compiled objects can be pickled, or sent to other processes in a smaller
+    format with dumps and loads when every param is a built-in type. Only
+    the Cypher string and the params are written, the link classes are not
+    needed to load them.
+    """
+    __slots__ = ()
+    MAGIC = b'PYPHER\x01'
+
+    def __str__(self):
+        return self.cypher
+
+    def __reduce__(self):
+        # the params proxy cannot be pickled, a plain dict is written instead
+        return (_load_compiled, (self.cypher, dict(self.params)))
+
+    def dumps(self):
+        """
+        Method used to serialize the Compiled object into bytes.
+
+        :return: the serialized query
+        :rtype: bytes
+        """
+        params = {}
+        unbound = []
+
+        for name, value in self.params.items():
+            if value is UNBOUND:
+                unbound.append(name)
+            else:
+                params[name] = value
+
+        try:
+            data = marshal.dumps((self.cypher, params, tuple(unbound)))
+        except ValueError as e:
+            error = ('The params of the query cannot be serialized, only'
+                ' built-in types are supported: {}'.format(e))
+
+            raise PypherArgumentException(error)
+
+        return self.MAGIC + data
+
+    @classmethod
+    def loads(cls, data):
+        """
+        Method used to load a Compiled object from the bytes created by
+        dumps.
+
+        :param bytes data: the serialized query
+        :return: the query
+        :rtype: Compiled
+        """
+        if data[:len(cls.MAGIC)] != cls.MAGIC:
+            error = 'The data is not a serialized Compiled query'
+
+            raise PypherArgumentException(error)
+
+        cypher, params, unbound = marshal.loads(data[len(cls.MAGIC):])
+
+        for name in unbound:
+            params[name] = UNBOUND
+
+        return cls(cypher, MappingProxyType(params))
+
+
+def _load_compiled(cypher, params):
+    return Compiled(cypher, MappingProxyType(params))
+
+
+class Template(object):
+    """
+    This object holds the Cypher string of a compiled Pypher instance and the
+    params that were bound to it. It is used to run the same query many times
+    with different values without rebuilding or re-rendering the chain.
+
+    Values are referenced by name using Param objects:
+
+        p = Pypher()
+        p.MATCH.node('u', 'User', id=Param('user_id'))
+        p.SET.u.__name__ == Param('name')
+        template = p.template()
+
+        template.cypher # MATCH (u:`User` {`id`: $user_id}) SET u.`name` = $name
+        template.bind(user_id=1, name='Mark') # {'name': 'Mark', 'user_id': 1}
+
+    :param Pypher pypher: the Pypher instance that will be compiled
+    """
+
+    def __init__(self, pypher):
+        compiled = pypher.compile()
+        params = compiled.params
+        self.cypher = compiled.cypher
+        self.names = frozenset(params)
+        self.required = frozenset(k for k, v in params.items()
+            if v is UNBOUND)
+        self.defaults = dict((k, v) for k, v in params.items()
+            if v is not UNBOUND)
+
+    def __str__(self):
+        return self.cypher
+
+    def bind(self, **values):
+        """
+        Method used to create the params for one run of the Template. Values
+        that are not passed in will use the value that was bound when the
+        Template was created.
+
+        :param values: the param name and value pairs to bind
+        :return: a new dict of all of the params
+        :rtype: dict
+        """
+        unknown = set(values) - self.names
+
+        if unknown:
+            error = 'The params: {} are not defined in the template'.format(
+                ', '.join(sorted(unknown)))
+            raise PypherArgumentException(error)
+
+        missing = self.required - set(values)
+
+        if missing:
+            error = 'The params: {} must be bound'.format(
+                ', '.join(sorted(missing)))
+            raise PypherArgumentException(error)
+
+        params = self.defaults.copy()
+        params.update(values)
+
+        return params
+
 
 class _Link(type):
+    """
+    The metaclass that registers every link class by its name and aliases.
+
+    The registry is never changed in place. A new copy is created with the
+    class added and then swapped in, so threads that are building queries
+    always see a complete registry without having to lock it.
+    """
 
     def __new__(cls, name, bases, attrs):
+        global _LINKS, _RESOLVED
+
         cls = super(_Link, cls).__new__(cls, name, bases, attrs)
         aliases = attrs.get('_ALIASES', None)
-        _LINKS[name.lower()] = cls
-
-        if aliases:
-            for alias in aliases:
-                alias_low = alias.lower()
-
-                if CHECK_CUSTOM_CLASHES:
-                    if alias in _LINKS:
-                        error = ('The alias: "{}" defined in "{}" is already'
-                            ' used by "{}"'.format(alias, name, _LINKS[alias]))
-                        raise PypherAliasException(error)
-                    elif alias_low in _LINKS:
-                        error = ('The alias: "{}" defined in "{}" is already'
-                            ' used by "{}"'.format(alias, name, 
-                            _LINKS[alias_low]))
-                        raise PypherAliasException(error)
-
-                _LINKS[alias] = cls
-                _LINKS[alias_low] = cls
+
+        with _REGISTRY_LOCK:
+            # pending pre defined classes that this one would replace are
+            # created first, as they would have been when the module was
+            # imported
+            for key in [name] + list(aliases or []):
+                if key.lower() in _PENDING:
+                    _create_pending(key)
+
+            links = dict(_LINKS)
+            links[name.lower()] = cls
+
+            if aliases:
+                for alias in aliases:
+                    alias_low = alias.lower()
+
+                    if CHECK_CUSTOM_CLASHES:
+                        if alias in links:
+                            error = ('The alias: "{}" defined in "{}" is'
+                                ' already used by "{}"'.format(alias, name,
+                                links[alias]))
+                            raise PypherAliasException(error)
+                        elif alias_low in links:
+                            error = ('The alias: "{}" defined in "{}" is'
+                                ' already used by "{}"'.format(alias, name,
+                                links[alias_low]))
+                            raise PypherAliasException(error)
+
+                    links[alias] = cls
+                    links[alias_low] = cls
+
+            # the cached attribute resolutions are dropped after the new
+            # registry is in place, see _resolve
+            _LINKS = links
+            _RESOLVED = {}
 
         return cls
 
 
+class _Segment(object):
+    """
+    A run of links that is shared by a Pypher instance and its clones. The
+    run starts at head and ends at tail, following the next attribute of each
+    link in between. The next attribute of the tail is never read, the
+    instances that share the segment each keep their own links after it.
+    Segments are never changed, removing a shared link creates a new one.
+
+    :param _Segment previous: the segment that comes before this one
+    :param head: the first link
+    :param tail: the last link
+    :param before_tail: the link before the tail, if it is known
+    """
+    __slots__ = ('previous', 'head', 'tail', 'before_tail', '_digest')
+
+    def __init__(self, previous, head, tail, before_tail=None):
+        self.previous = previous
+        self.head = head
+        self.tail = tail
+        self.before_tail = before_tail
+        self._digest = None
+
+    def _iter_run(self):
+        link = self.head
+
+        while True:
+            yield link
+
+            if link is self.tail:
+                return
+
+            link = link.next
+
+    def __iter__(self):
+        segments = []
+        segment = self
+
+        while segment is not None:
+            segments.append(segment)
+            segment = segment.previous
+
+        for segment in reversed(segments):
+            for link in segment._iter_run():
+                yield link
+
+    def drop_last(self):
+        """
+        Method used to get the segment without its last link.
+
+        :return: a new segment, or the previous one if the tail was the only
+            link
+        :rtype: _Segment
+        """
+        if self.head is self.tail:
+            return self.previous
+
+        before = self.before_tail
+
+        if before is None:
+            before = self.head
+
+            while before.next is not self.tail:
+                before = before.next
+
+        return _Segment(self.previous, self.head, before)
+
+    def digest(self):
+        """
+        Method used to hash the shape of every link in the segment, see
+        Pypher.fingerprint. The hash is kept unless one of the links is
+        volatile, callers must copy it before they update it.
+
+        :return: the hash and whether it was kept
+        :rtype: tuple
+        """
+        if self._digest is not None:
+            return self._digest, True
+
+        import hashlib
+
+        if self.previous is None:
+            digest, stable = hashlib.sha1(), True
+        else:
+            digest, stable = self.previous.digest()
+            digest = digest.copy()
+
+        for link in self._iter_run():
+            stable = stable and not link._is_volatile()
+            digest.update(link._fingerprint_part())
+
+        if stable:
+            self._digest = digest
+
+        return digest, stable
+
+    def __getstate__(self):
+        return self.previous, list(self._iter_run())
+
+    def __setstate__(self, state):
+        previous, links = state
+
+        for link, nxt in zip(links, links[1:]):
+            object.__setattr__(link, 'next', nxt)
+
+        before = links[-2] if len(links) > 1 else None
+
+        self.__init__(previous, links[0], links[-1], before)
+
+
 class Pypher(with_metaclass(_Link)):
+    """
+    The root object of the Cypher builder. Every attribute access, call, or
+    operation on an instance adds a link to the chain.
+
+    :param Pypher parent: the instance that this one is nested in
+    :param Params params: the Params object that will hold the bound params
+    :param bool deterministic: when True the params that are bound to the
+        instance will be named the same way every time the same query is
+        built, instead of using a random key. This allows the database to
+        reuse its query plans. Defaults to the module level
+        DETERMINISTIC_PARAMS setting
+    """
     PARAM_PREFIX = '$NEO'
+    __slots__ = ('_parent', 'next', '_bottom', '_before_bottom',
+        '_generation', '_compiled', '_params', '_deterministic',
+        '_fingerprint', '_prefix')
+
+    def __init__(self, parent=None, params=None, deterministic=None, *args,
+                 **kwargs):
+        self._parent = parent
+        self._prefix = None
+        self.next = None
+        self._bottom = None
+        self._before_bottom = None
+        self._generation = 0
+        self._compiled = None
+        self._deterministic = deterministic
+        self._fingerprint = None
+
+        # the Params object is only created when it is first needed, links
+        # and nested instances that are added to a chain use their parent's
+        self._params = params
+
+    def reset(self):
+        self._prefix = None
+        self.next = None
+        self._bottom = None
+        self._before_bottom = None
+
+        if self._params is not None:
+            self._deterministic = self._params.deterministic
+
+        self._params = None
+        self._fingerprint = None
+        self._invalidate()
+
+    def _invalidate(self):
+        """
+        Method used to mark the cached Cypher string of this instance, and of
+        every instance that it is nested in, as stale. It is called whenever
+        the chain is changed.
+
+        :return: None
+        """
+        pypher = self
+
+        while pypher is not None:
+            _setattr(pypher, '_generation', pypher._generation + 1)
+            _setattr(pypher, '_compiled', None)
+            pypher = pypher._parent
+
+    def _compile_key(self):
+        return (self._generation, self.params, self.params._version,
+            tuple(QUOTES.values()), BUDGET['in_list_param'])
+
+    def _cached(self):
+        """
+        Method used to get the cached render of the instance if it is still
+        current. Changing a nested instance only invalidates the instance
+        that its parent attribute points to, but it can be nested in many,
+        so the generation of every nested instance that was rendered is kept
+        with the cache and checked as well.
+
+        :return: the cached (key, cypher, Compiled, nested) tuple or None
+        """
+        compiled = self._compiled
+
+        if compiled is None or compiled[0] != self._compile_key():
+            return None
+
+        for pypher, generation in compiled[3]:
+            if pypher._generation != generation:
+                return None
+
+        return compiled
+
+    def _rendered(self, generation, nested, cached):
+        # adds this instance, and the instances that were nested in it, to
+        # the instance that is being rendered around it
+        outer = getattr(_RENDERING, 'nested', None)
+
+        if outer is not None:
+            outer.append((self, generation))
+            outer.extend(nested)
+
+        # and its links to the count of a budget, see _Budget.render_link. The
+        # nested instances were already counted unless the cache was used.
+        # The builtin sum is replaced by the Cypher function in this module
+        links = getattr(_RENDERING, 'links', None)
+
+        if links is not None:
+            counted = [self]
+
+            if cached:
+                counted.extend(pypher for pypher, generation in nested)
+
+            for pypher in counted:
+                for link in pypher.iter_links():
+                    links += 1
+
+            _RENDERING.links = links
+
+    @property
+    def _(self):
+        return self
+
+    @property
+    def fingerprint(self):
+        """
+        A hash of the structure of the chain: the link classes, names,
+        labels, operators, and where params are used, but not their values or
+        their generated names. Two instances that create the same query with
+        different values have the same fingerprint.
+
+        The shape of every link is added to a running hash the first time
+        that the fingerprint is read after it was added, reading it again only
+        adds the links that were added since. The last link is never added to
+        the running hash so that it can be replaced, like it is every time a
+        link is called, without starting over.
+
+        :return: the hex digest of the structure of the chain
+        :rtype: str
+        """
+        # the running hash is only ever replaced, never updated in place, so
+        # that it can be read from many threads without a lock
+        import hashlib
+
+        tail = self._get_tail()
+        running = self._fingerprint
+        stable = True
+
+        if running is None:
+            last = None
+
+            if self._prefix is None:
+                digest = hashlib.sha1()
+            else:
+                # the links shared with clones are hashed once for all of
+                # them
+                digest, stable = self._prefix.digest()
+        else:
+            digest, last = running
+
+        if tail is None or last is tail:
+            return digest.hexdigest()
+
+        link = self.next if last is None else last.next
+        digest = digest.copy()
+        current = digest
+
+        while link is not tail:
+            # links that hold Partial objects can change after they were
+            # added, they and every link after them are hashed on every read
+            if current is digest and link._is_volatile():
+                current = digest.copy()
+
+            current.update(link._fingerprint_part())
+
+            if current is digest:
+                last = link
+
+            link = link.next
+
+        if stable:
+            self._fingerprint = (digest, last)
+
+        if current is digest:
+            current = digest.copy()
+
+        current.update(tail._fingerprint_part())
+
+        return current.hexdigest()
+
+    def _fingerprint_part(self):
+        return (self._shape() + '\n').encode('utf-8')
+
+    def _shape(self):
+        return self.__class__.__name__
+
+    def _is_volatile(self):
+        return False
+
+    def __setattr__(self, attr, value):
+        try:
+            object.__setattr__(self, attr, value)
+        except AttributeError:
+            # augmented assignments, p.SET.n += 1, assign the chain back to
+            # the last attribute that was accessed. The chain is already
+            # updated by then so there is nothing to store
+            if value is not self:
+                raise
+
+    def _get_parent(self):
+        return self._parent
+
+    def _set_parent(self, parent):
+        if not parent:
+            return self
+
+        self._parent = parent
+        params = self._params
+
+        # once an instance has a parent, its params are the parent's. Any
+        # params that were bound to it before that are merged in
+        if params is not None:
+            if params._bound_params and params is not parent.params:
+                parent.params.merge(params)
+
+            self._params = None
+
+        return self
+
+    parent = property(_get_parent, _set_parent)
+
+    def _get_params(self):
+        params = self._params
+
+        if params is None:
+            if self._parent is not None:
+                # while a query is rendered, see _Rendering
+                rendering = getattr(_RENDERING, 'params', None)
+
+                if rendering is not None:
+                    return rendering
+
+                return self._parent.params
+
+            # the params lock the query, two threads that render it for the
+            # first time must not create one each
+            with _PARAMS_LOCK:
+                params = self._params
+
+                if params is None:
+                    params = self._params = Params(prefix=self.PARAM_PREFIX,
+                        deterministic=self._deterministic)
+
+        return params
+
+    def _set_params(self, params):
+        self._params = params
+
+    params = property(_get_params, _set_params)
+
+    @property
+    def bound_params(self):
+        return self.params.bound_params
+
+    @property
+    def params_view(self):
+        """
+        A read-only view of the bound params that can be passed straight to
+        a driver, see Params.view. The params are only bound when the chain
+        is rendered.
+
+        :return: the param name to value mapping
+        :rtype: MappingProxyType
+        """
+        return self.params.view
+
+    def safely_stringify_for_pudb(self):
+        return None
+
+    def bind_params(self, params=None):
+        self.params.pypher = self
+        return self.params.bind_params(params=params)
+
+    def bind_param(self, value, name=None):
+        self.params.pypher = self
+        return self.params.bind_param(value=value, name=name)
+
+    def __getattr__(self, attr):
+        factory = _RESOLVED.get(attr, None)
+
+        if factory is None:
+            factory = _resolve(attr)
+
+        return self.add_link(factory())
+
+    def __call__(self, *args, **kwargs):
+        bottom = self._bottom
+
+        if bottom is None and self._prefix is not None:
+            bottom = self._prefix.tail
+
+        if 'name' not in kwargs and type(bottom) is Statement:
+            kwargs['name'] = bottom.name
+
+        func = bottom.__class__(*args, **kwargs)
+
+        return self.remove_link(bottom).add_link(func)
+
+    def __getitem__(self, *args):
+        comp = List(parent=self, *args)
+
+        return self.add_link(comp)
+
+    def compile(self):
+        """
+        Method used to render the chain and collect its params into an
+        immutable Compiled object. The result is cached, compiling an
+        unchanged instance again returns the same object without rendering.
+
+        :return: the Cypher string and a read-only snapshot of the params
+        :rtype: Compiled
+        """
+        compiled = self._cached()
+
+        if compiled is not None and compiled[2] is not None:
+            return compiled[2]
+
+        with _Rendering(self.params):
+            cypher = self.__unicode__()
+            compiled = self._compiled
+
+            # the chain changed while it was being rendered and cannot be
+            # cached
+            if compiled is None:
+                return Compiled(cypher, MappingProxyType(dict(self.params.view)))
+
+            if compiled[2] is None:
+                result = Compiled(cypher, MappingProxyType(dict(self.params.view)))
+                compiled = self._compiled = (compiled[0], cypher, result,
+                    compiled[3])
+
+            return compiled[2]
+
+    def __str__(self):
+        return self.__unicode__()
+
+    def __unicode__(self):
+        compiled = self._cached()
+
+        if compiled is not None:
+            self._rendered(compiled[0][0], compiled[3], True)
+
+            return compiled[1]
+
+        # rendering binds params, only one thread renders the same query at
+        # a time. Nested instances are rendered in the same context
+        with _Rendering(self.params):
+            return self._render()
+
+    def _iter_parts(self, budget=None):
+        # every rendered link is held back until the next one is rendered,
+        # the next link decides if the whitespace at the end of the held one
+        # is removed or if a space is needed in between them
+        part = None
+        rendering = _Rendering(self.params)
+        count = budget is not None and budget.max_links is not None
+
+        for token in self.iter_links():
+            # the context is entered for each link so that it is not left
+            # open while the fragments are being streamed
+            with rendering:
+                token.parent = self
+                pre = ''
+                suff = ''
+
+                if token._CLEAR_PRECEEDING_WS and part is not None:
+                    part = part.rstrip()
+
+                if token._ADD_PRECEEDING_WS:
+                    if not part or part[-1] != ' ':
+                        pre = ' '
+
+                if token._ADD_SUCEEDING_WS:
+                    suff = ' '
+
+                if count:
+                    text = budget.render_link(str, token)
+                else:
+                    text = str(token)
+
+                current = '{}{}{}'.format(pre, text, suff)
+
+            if part is not None:
+                yield part
+
+            part = current
+
+        if part is not None:
+            yield part
+
+    def iter_links(self):
+        """
+        Generator used to walk every link in the chain. The links that are
+        shared with clones come first, they are not reachable through next,
+        see clone.
+
+        :return: a generator of links
+        """
+        if self._prefix is not None:
+            for link in self._prefix:
+                yield link
 
-    def __init__(self, parent=None, params=None, *args, **kwargs):
-        self._ = self
-        self._parent = parent
-        self.next = None
-        self.params = params or Params(prefix=self.PARAM_PREFIX)
+        link = self.next
 
-    def reset(self):
-        self.next = None
-        self.params = Params(prefix=self.PARAM_PREFIX)
+        while link is not None:
+            yield link
+            link = link.next
 
-    def _get_parent(self):
-        return self._parent
+    def iter_fragments(self):
+        """
+        Generator used to render the chain one link at a time. The fragments
+        join to the same Cypher string that str() returns, but the whole
+        string is never held in memory. Params are bound as the links are
+        rendered.
 
-    def _set_parent(self, parent):
-        if not parent:
-            return self
+        Whitespace at the start and the end of the query is dropped, the
+        whitespace at the end of a fragment is only yielded once there is
+        more text after it.
 
-        self._parent = parent
-        parent.params += self.params
-        self.params = parent.params
+        :return: a generator of strings
+        """
+        whitespace = ''
+        started = False
+        budget = None
 
-        return self
+        # only the outermost instance is checked, nested instances are part
+        # of its text and bind their params to it
+        if self._parent is None:
+            budget = _Budget.start(self)
 
-    parent = property(_get_parent, _set_parent)
+        for part in self._iter_parts(budget):
+            if budget is not None:
+                budget.add(part)
 
-    @property
-    def bound_params(self):
-        return self.params.bound_params
+            if not started:
+                part = part.lstrip()
 
-    def safely_stringify_for_pudb(self):
-        return None
+                if not part:
+                    continue
 
-    def bind_params(self, params=None):
-        self.params.pypher = self
-        return self.params.bind_params(params=params)
+                started = True
 
-    def bind_param(self, value, name=None):
-        self.params.pypher = self
-        return self.params.bind_param(value=value, name=name)
+            text = part.rstrip()
 
-    def __getattr__(self, attr):
-        attr_low = attr.lower()
+            if not text:
+                whitespace += part
+                continue
 
-        if attr_low[:2] == '__' and attr_low[-2:] == '__':
-            link = Property(name=attr.strip('__'))
-        elif attr_low in _LINKS:
-            link = _LINKS[attr_low]()
-        else:
-            link = Statement(name=attr)
+            if whitespace:
+                yield whitespace
 
-        return self.add_link(link)
+            yield text
+            whitespace = part[len(text):]
 
-    def __call__(self, *args, **kwargs):
-        if ('name' not in kwargs and '_name' in self._bottom.__dict__
-            and type(self._bottom) is Statement):
-            kwargs['name'] = self._bottom.name
+    def write(self, fp):
+        """
+        Method used to write the Cypher string to a writable object, a file,
+        an io.StringIO, etc., one fragment at a time. An instance that was
+        already rendered writes its cached string.
 
-        func = self._bottom.__class__(*args, **kwargs)
+        :param fp: an object with a write method
+        :return: the number of characters that were written
+        :rtype: int
+        """
+        compiled = self._cached()
 
-        return self.remove_link(self._bottom).add_link(func)
+        if compiled is not None:
+            fp.write(compiled[1])
 
-    def __getitem__(self, *args):
-        comp = List(parent=self, *args)
+            return len(compiled[1])
 
-        return self.add_link(comp)
+        written = 0
 
-    def __str__(self):
-        return self.__unicode__()
+        for fragment in self.iter_fragments():
+            fp.write(fragment)
+            written += len(fragment)
 
-    def __unicode__(self):
-        token = self.next
-        prev = token
-        tokens = []
+        return written
 
-        while token:
-            token.parent = self
-            pre = ''
-            suff = ''
+    def _render(self):
+        compiled = self._cached()
 
-            if token._CLEAR_PRECEEDING_WS:
-                try:
-                    tokens[-1] = tokens[-1].rstrip()
-                except Exception as e:
-                    pass
+        # another thread could have rendered it while this one was waiting
+        if compiled is not None:
+            self._rendered(compiled[0][0], compiled[3], True)
 
-            if token._ADD_PRECEEDING_WS:
-                try:
-                    skip = tokens[-1][-1] == ' '
-                except Exception as e:
-                    skip = False
+            return compiled[1]
 
-                if not skip:
-                    pre = ' '
+        generation = self._generation
+        outer = getattr(_RENDERING, 'nested', None)
+        nested = _RENDERING.nested = []
 
-            if token._ADD_SUCEEDING_WS:
-                suff = ' '
+        try:
+            cypher = ''.join(self.iter_fragments())
+        finally:
+            _RENDERING.nested = outer
 
-            part = '{}{}{}'.format(pre, str(token), suff)
-            tokens.append(part)
+        # a chain that changed while it was being rendered (Partial objects
+        # rebuild themselves every time) cannot be reused, neither can the
+        # instances that it is nested in
+        if self._generation == generation:
+            self._compiled = (self._compile_key(), cypher, None,
+                tuple(nested))
 
-            prev = token
-            token = token.next
+        self._rendered(generation, nested, False)
 
-        return ''.join(tokens).strip()
+        return cypher
 
     def __add__(self, other):
         return self.operator(operator='+', value=other)
@@ -541,38 +1801,75 @@ class Pypher(with_metaclass(_Link)):
 
         return self.add_link(statement)
 
+    def template(self):
+        """
+        Method used to compile the current instance into a Template. The
+        Cypher string is created once and each call to Template.bind only
+        builds a new params dict.
+
+        :return: a Template of the current instance
+        :rtype: Template
+        """
+        return Template(self)
+
     def apply_partial(self, partial):
         partial.pypher = self
         partial.build()
 
         return self
 
+    def _get_tail(self):
+        """
+        Method used to get the last link in the chain. The tail is tracked in
+        the _bottom attribute; if links were attached to it from outside of
+        this instance (via another instance's append, for example) the
+        pointer is walked forward and updated.
+
+        :return: the last link in the chain or None if the chain is empty
+        """
+        tail = self._bottom or self.next
+
+        if tail is None:
+            return None
+
+        while tail.next is not None:
+            _setattr(self, '_before_bottom', tail)
+            tail = tail.next
+
+        _setattr(self, '_bottom', tail)
+
+        return tail
+
     def add_link(self, link, before_self=False):
         if before_self:
+            self._thaw()
             link.parent = self.parent or self
             link.next = self.next
+
+            if self.next is None:
+                self._bottom = link
+            elif self.next is self._bottom:
+                self._before_bottom = link
+
             self.next = link
+            self._fingerprint = None
+            self._invalidate()
 
             return self
 
+        # this is called for every step of the chain, the attributes are set
+        # without going through Pypher.__setattr__
         link.parent = self
-        token = self.next
-
-        if not token:
-            self.next = link
-            self._bottom = link
+        tail = self._get_tail()
 
-            return self
+        if tail is None:
+            _setattr(self, 'next', link)
+        else:
+            tail.next = link
 
-        while token:
-            try:
-                token.next.next
-                token = token.next
-                continue
-            except Exception as e:
-                token.next = link
-                self._bottom = link
-                break
+        _setattr(self, '_before_bottom', tail)
+        _setattr(self, '_bottom', link)
+        self._invalidate()
 
         return self
 
@@ -580,70 +1877,304 @@ class Pypher(with_metaclass(_Link)):
         link = self.next
 
         if not link:
+            return self._remove_shared(remove)
+
+        self._invalidate()
+
+        # the fingerprint can be kept when the last link is removed, unless it
+        # was already added to it
+        running = self._fingerprint
+
+        if (running is not None and running[1] is not None
+            and (remove is not self._bottom or remove is running[1])):
+            self._fingerprint = None
+
+        if link is remove:
+            self.next = remove.next
+
+            if remove is self._bottom:
+                self._bottom = self.next
+                self._before_bottom = None
+
             return self
-        elif id(link) == id(remove):
-            self.next = None
-            self._bottom = None
+
+        before = self._before_bottom
+
+        # the last link is removed every time a link is called, use the
+        # tracked pointers instead of walking the chain
+        if (remove is self._bottom and before is not None
+            and before.next is remove and remove.next is None):
+            before.next = None
+            self._bottom = before
+            self._before_bottom = None
 
             return self
 
-        while link:
-            if id(link.next) == id(remove):
-                link.next = link.next.next
-                break
+        while link.next is not None:
+            if link.next is remove:
+                link.next = remove.next
+
+                if remove is self._bottom:
+                    self._bottom = link
+                    self._before_bottom = None
+                elif remove is self._before_bottom:
+                    self._before_bottom = link
+
+                return self
 
             link = link.next
 
+        return self._remove_shared(remove)
+
+    def _remove_shared(self, remove):
+        prefix = self._prefix
+
+        if prefix is None:
+            return self
+
+        if remove is prefix.tail:
+            self._prefix = prefix.drop_last()
+        elif not self._thaw(skip=remove):
+            return self
+
+        self._fingerprint = None
+        self._invalidate()
+
         return self
 
+    def _freeze(self):
+        """
+        Method used to move the links of the chain into a segment that can be
+        shared with clones. The links that are added after that are linked
+        from next again.
+
+        :return: the segment
+        :rtype: _Segment
+        """
+        head = self.next
+
+        if head is not None:
+            tail = self._get_tail()
+            before = self._before_bottom
+
+            if before is not None and before.next is not tail:
+                before = None
+
+            self._prefix = _Segment(self._prefix, head, tail, before)
+            self.next = None
+            self._bottom = None
+            self._before_bottom = None
+            self._fingerprint = None
+
+        return self._prefix
+
+    def _thaw(self, skip=None):
+        """
+        Method used to copy the links that are shared with clones into this
+        chain so that they can be changed.
+
+        :param skip: a shared link that is left out of the copy
+        :return: True if the skipped link was found
+        :rtype: bool
+        """
+        prefix = self._prefix
+
+        if prefix is None:
+            return False
+
+        head = tail = before = None
+        skipped = False
+
+        for link in prefix:
+            if link is skip:
+                skipped = True
+                continue
+
+            copy = link._copy()
+            copy.next = None
+            copy.parent = self
+
+            if tail is None:
+                head = copy
+            else:
+                tail.next = copy
+
+            before, tail = tail, copy
+
+        self._prefix = None
+
+        if tail is None:
+            return skipped
+
+        tail.next = self.next
+
+        if self.next is None:
+            self._bottom = tail
+            self._before_bottom = before
+        elif self.next is self._bottom:
+            self._before_bottom = tail
+
+        self.next = head
+
+        return skipped
+
     def append(self, pypher):
-        token = self.next
+        pypher._thaw()
+        tail = self._get_tail()
 
-        if not token:
+        if tail is None:
             self.next = pypher.next
-            self._bottom = pypher.next
+        else:
+            tail.next = pypher.next
 
-        while token:
-            try:
-                token.next.next
-                token = token.next
-            except Exception as e:
-                token.next = pypher.next
-                self._bottom = pypher.next
-                break
+        if pypher.next is not None:
+            self._bottom = pypher._bottom or pypher.next
+
+            if self._bottom is pypher.next:
+                self._before_bottom = tail
+            else:
+                self._before_bottom = pypher._before_bottom
+
+        self._invalidate()
 
         return self
 
-    def clone(self, pypher=None):
-        pypher = Pypher()
-        link = self.next
-        nxt = pypher
+    def _copy(self):
+        """
+        Method used to create a shallow copy of a link. The attributes are
+        read through the slot descriptors so that an unset slot is never
+        resolved through __getattr__ and added as a link.
+
+        :return: a new instance of the same class with the same attributes
+        """
+        cls = self.__class__
+        clone = cls.__new__(cls)
+
+        for slot, descriptor in _slots(cls):
+            try:
+                descriptor.__set__(clone, descriptor.__get__(self, cls))
+            except AttributeError:
+                pass
+
+        attrs = _instance_dict(self)
+
+        if attrs:
+            object.__getattribute__(clone, '__dict__').update(attrs)
+
+        return clone
+
+    def __getstate__(self):
+        # the chain is written out as a flat list of links instead of through
+        # each link's next attribute so that long chains do not hit the
+        # recursion limit when pickled. The cached string and the running
+        # fingerprint are rebuilt after loading
+        cls = self.__class__
+        is_link = isinstance(self, _BaseLink)
+        state = {}
+        links = []
+
+        for slot, descriptor in _slots(cls):
+            if slot in _UNPICKLED_SLOTS or (is_link and slot == 'next'):
+                continue
 
-        while link:
             try:
-                clone = link.__class__()
-                clone.__dict__ = copy.copy(link.__dict__)
-                clone.__dict__['next'] = None
-                link = link.next
-                nxt.next = clone
-                nxt._bottom = clone
-                nxt = clone
-            except Exception as e:
-                break
+                state[slot] = descriptor.__get__(self, cls)
+            except AttributeError:
+                pass
+
+        if not is_link:
+            link = state.get('next')
+
+            while link is not None:
+                links.append(link)
+                link = object.__getattribute__(link, 'next')
+
+        return state, links, _instance_dict(self)
+
+    def __setstate__(self, state):
+        state, links, attrs = state
+        cls = self.__class__
+
+        for slot, descriptor in _slots(cls):
+            if slot in state:
+                descriptor.__set__(self, state[slot])
+            elif slot in _UNPICKLED_SLOTS:
+                descriptor.__set__(self, None)
+            elif slot == 'next':
+                # a link's next is set by the instance that holds its chain,
+                # which may have been loaded first
+                try:
+                    descriptor.__get__(self, cls)
+                except AttributeError:
+                    descriptor.__set__(self, None)
+
+        for link, nxt in zip(links, links[1:] + [None]):
+            object.__setattr__(link, 'next', nxt)
+
+        if attrs:
+            object.__getattribute__(self, '__dict__').update(attrs)
+
+    def clone(self, pypher=None):
+        """
+        Method used to create a copy of the chain that can be changed without
+        changing this one. The links are not copied, they are frozen into a
+        segment that both instances share and the links that are added to
+        either one afterwards only belong to it. A shared link is only copied
+        when it is removed from one of the instances, or a link is added
+        before it.
+
+        The copy has its own Params object with the params that were bound so
+        far.
+
+        :return: the copy
+        :rtype: Pypher
+        """
+        with _Rendering(self.params):
+            prefix = self._freeze()
+            pypher = Pypher(params=self.params.clone())
+            pypher._prefix = prefix
 
         return pypher
 
 
 class _BaseLink(Pypher):
+    """
+    The base of every link in a chain. Links do not hold their own Params
+    object, once they are added to a chain they use their parent's.
+    """
     _CLEAR_PRECEEDING_WS = False
     _ADD_PRECEEDING_WS = False
     _ADD_SUCEEDING_WS = True
+    __slots__ = ('args', 'kwargs')
+
+    # links are never the target of an augmented assignment, they use the
+    # faster default
+    __setattr__ = object.__setattr__
 
     def __init__(self, *args, **kwargs):
         self.args = args
         self.kwargs = kwargs
         super(_BaseLink, self).__init__()
 
+    def _shape(self):
+        parts = [shape(arg) for arg in self.args]
+
+        for k, v in sorted(self.kwargs.items()):
+            parts.append('{}={}'.format(k, shape(v)))
+
+        return '{}({})'.format(self.__class__.__name__, ', '.join(parts))
+
+    def _is_volatile(self):
+        for arg in self.args:
+            if isinstance(arg, Partial):
+                return True
+
+        for arg in self.kwargs.values():
+            if isinstance(arg, Partial):
+                return True
+
+        return False
+
     def __unicode__(self):
         return self.__class__.__name__.upper()
 
@@ -652,12 +2183,10 @@ class Statement(_BaseLink):
     _ADD_PRECEEDING_WS = True
     _ADD_SUCEEDING_WS = True
     _CAPITALIZE = True
+    __slots__ = ('_name',)
 
     def __init__(self, *args, **kwargs):
-        try:
-            self._name = kwargs.pop('name')
-        except:
-            self._name = None
+        self._name = kwargs.pop('name', None)
 
         super(Statement, self).__init__(*args, **kwargs)
 
@@ -671,6 +2200,19 @@ class Statement(_BaseLink):
 
         return self.__class__.__name__
 
+    def _shape_arg(self, arg):
+        # the args are written into the query as is, only Param objects are
+        # bound
+        if isinstance(arg, Param):
+            return shape(arg)
+
+        return raw_shape(arg)
+
+    def _shape(self):
+        args = ', '.join(self._shape_arg(arg) for arg in self.args)
+
+        return '{}:{}({})'.format(self.__class__.__name__, self.name, args)
+
     def __unicode__(self):
         if self.args:
             parts = []
@@ -695,6 +2237,7 @@ class Property(Statement):
     _ADD_PRECEEDING_WS = False
     _CLEAR_PRECEEDING_WS = True
     _ALIASES = ['prop',]
+    __slots__ = ()
 
     def __init__(self, name=None):
         super(Property, self).__init__(name=name)
@@ -711,6 +2254,7 @@ class Label(Statement):
         '+': ':',
         '|': '|',
     }
+    __slots__ = ('_labels', '_operator')
 
     def __init__(self, labels=None, default_operator='+'):
         self._labels = []
@@ -744,6 +2288,11 @@ class Label(Statement):
 
     operator = property(_get_operator, _set_operator)
 
+    def _shape(self):
+        labels = self.operator.join(str(l) for l in self.labels)
+
+        return 'Label({})'.format(labels)
+
     def __unicode__(self):
         if not self.labels:
             return ''
@@ -755,8 +2304,27 @@ class Label(Statement):
 
 
 class IN(Statement):
+    """
+    The IN operator. Each argument is bound as its own param unless there
+    are more than BUDGET['in_list_param'] of them, then the whole list is
+    bound as one param, IN $param, so that the database does not have to
+    parse and plan a literal list of thousands of params.
+    """
+    __slots__ = ()
+
+    def _shape_arg(self, arg):
+        return shape(arg)
 
     def __unicode__(self):
+        limit = BUDGET['in_list_param']
+
+        if (limit is not None and len(self.args) > limit
+            and all(is_plain(arg) for arg in self.args)):
+            param = self.bind_param(list(self.args),
+                self.params.param_name('in'))
+
+            return 'IN {}'.format(param.placeholder)
+
         args = []
 
         for arg in self.args:
@@ -779,6 +2347,10 @@ class IN(Statement):
 
 class Func(Statement):
     _CAPITALIZE = False
+    __slots__ = ()
+
+    def _shape_arg(self, arg):
+        return shape(arg)
 
     def get_args(self):
         args = []
@@ -803,6 +2375,10 @@ class Func(Statement):
 
 
 class FuncRaw(Func):
+    __slots__ = ()
+
+    def _shape_arg(self, arg):
+        return raw_shape(arg)
 
     def get_args(self):
         args = []
@@ -818,9 +2394,14 @@ class FuncRaw(Func):
 
 class ID(FuncRaw):
     name = 'id'
+    __slots__ = ()
 
 
 class Raw(Statement):
+    __slots__ = ()
+
+    def _shape_arg(self, arg):
+        return raw_shape(arg)
 
     def __unicode__(self):
         args = []
@@ -840,6 +2421,7 @@ class Conditional(Func):
     _ADD_PRECEEDING_WS = True
     _ADD_SUCEEDING_WS = True
     _SEPARATOR = ', '
+    __slots__ = ()
 
     def __unicode__(self):
         parts = []
@@ -862,15 +2444,19 @@ class Conditional(Func):
 class ConditionalAND(Conditional):
     _SEPARATOR = ' AND '
     _ALIASES = ['CAND', 'COND_AND']
+    __slots__ = ()
 
 
 class ConditionalOR(Conditional):
     _SEPARATOR = ' OR '
     _ALIASES = ['COR', 'COND_OR']
+    __slots__ = ()
 
 
 
 class _APOCBitwiseBase(Func):
+    __slots__ = ()
+
     def __unicode__(self):
 
         def fix(arg):
@@ -883,17 +2469,16 @@ class _APOCBitwiseBase(Func):
 
             return value
 
-        if not isinstance(self.args, list):
-            self.args = list(self.args)
-
-        left = fix(self.args.pop(0))
+        # the args are not changed so that the link can be rendered again
+        left = fix(self.args[0])
+        args = self.args[1:]
 
-        if len(self.args) > 1:
-            bw = self.__class__(*self.args)
+        if len(args) > 1:
+            bw = self.__class__(*args)
             bw.parent = self.parent
             right = str(bw)
         else:
-            right = fix(self.args[0])
+            right = fix(args[0])
 
         return 'apoc.bitwise.op({}, "{}", {})'.format(left, self._OPERATOR,
             right)
@@ -902,41 +2487,49 @@ class _APOCBitwiseBase(Func):
 class BitwiseAnd(_APOCBitwiseBase):
     _ALIASES = ['BAND',]
     _OPERATOR = '&'
+    __slots__ = ()
 
 
 class BitwiseOr(_APOCBitwiseBase):
     _ALIASES = ['BOR',]
     _OPERATOR = '|'
+    __slots__ = ()
 
 
 class BitwiseXOr(_APOCBitwiseBase):
     _ALIASES = ['BXOR',]
     _OPERATOR = '^'
+    __slots__ = ()
 
 
 class BitwiseNot(_APOCBitwiseBase):
     _ALIASES = ['BNOT',]
     _OPERATOR = '~'
+    __slots__ = ()
 
 
 class BitwiseLeftShift(_APOCBitwiseBase):
     _ALIASES = ['BLSHIFT',]
     _OPERATOR = '>>'
+    __slots__ = ()
 
 
 class BitwiseRightShift(_APOCBitwiseBase):
     _ALIASES = ['BRSHIFT',]
     _OPERATOR = '<<'
+    __slots__ = ()
 
 
 class BitwiseUnsighedLeftShift(_APOCBitwiseBase):
     _ALIASES = ['BULSHIFT',]
     _OPERATOR = '>>>'
+    __slots__ = ()
 
 
 class List(_BaseLink):
     _ADD_PRECEEDING_WS = False
     _CLEAR_PRECEEDING_WS = True
+    __slots__ = ()
 
     def __unicode__(self):
         args = []
@@ -962,10 +2555,51 @@ class Comprehension(List):
     _ADD_PRECEEDING_WS = True
     _CLEAR_PRECEEDING_WS = False
     _ALIASES = ['comp']
+    __slots__ = ()
 
 
 class Map(_BaseLink):
+    """
+    A map literal. When it is created with map_param, the keyword values are
+    bound as one param instead of one param each. The map is rendered as
+    that param, $props, or as {key: $props.key, ...} if it also has
+    positional items or values that have to be rendered into the query.
+
+    :param map_param: the name of the param or True to create one
+    """
     _ADD_PRECEEDING_WS = True
+    _WHOLE_MAP_PARAM = True
+    __slots__ = ('map_param',)
+
+    def __init__(self, *args, **kwargs):
+        self.map_param = kwargs.pop('map_param', None)
+
+        super(Map, self).__init__(*args, **kwargs)
+
+    def _shape(self):
+        body = []
+
+        def shape_value(value, name=None):
+            if isinstance(value, (list, set, tuple)):
+                return '[{}]'.format(', '.join(shape(v) for v in value))
+
+            if name:
+                return '{}: {}'.format(name, shape(value))
+
+            return raw_shape(value)
+
+        for arg in self.args:
+            body.append(shape_value(arg))
+
+        for k, val in sorted(self.kwargs.items()):
+            if self.map_param and is_plain(val):
+                body.append('{}: $map'.format(k))
+            elif isinstance(val, (list, set, tuple)):
+                body.append('{}: {}'.format(k, shape_value(val)))
+            else:
+                body.append(shape_value(val, k))
+
+        return '{}({})'.format(self.__class__.__name__, ', '.join(body))
 
     def __unicode__(self):
         body = []
@@ -1001,12 +2635,28 @@ class Map(_BaseLink):
         for arg in self.args:
             body.append(prep_value(arg))
 
-        kwargs = OrderedDict(sorted(self.kwargs.items()))
+        kwargs = sorted(self.kwargs.items())
+        name = None
+
+        if self.map_param:
+            values = dict((k, v) for k, v in kwargs if is_plain(v))
+
+            if values:
+                name = bind_map_param(self, self.map_param, values)
+
+                if (self._WHOLE_MAP_PARAM and not self.args
+                    and len(values) == len(kwargs)):
+                    return '$' + name
 
-        for k, val in kwargs.items():
+        for k, val in kwargs:
             key = quote_map_key(k)
-            pair = '{}: {}'.format(key, prep_value(val, k))
-            body.append(pair)
+
+            if name and is_plain(val):
+                value = '${}.{}'.format(name, quote_propery(k))
+            else:
+                value = prep_value(val, k)
+
+            body.append('{}: {}'.format(key, value))
 
         body = ', '.join(body)
 
@@ -1015,12 +2665,19 @@ class Map(_BaseLink):
 
 class MapProjection(Map):
     _ALIASES = ['map_projection', 'projection',]
+    _WHOLE_MAP_PARAM = False
+    __slots__ = ('name',)
 
     def __init__(self, _name=None, *args, **kwargs):
         super(MapProjection, self).__init__(*args, **kwargs)
 
         self.name = _name
 
+    def _shape(self):
+        _map = super(MapProjection, self)._shape()
+
+        return '{} {}'.format(self.name, _map)
+
     def __unicode__(self):
         _map = super(MapProjection, self).__unicode__()
 
@@ -1031,9 +2688,11 @@ class Operator(_BaseLink):
     _ADD_PRECEEDING_WS = True
     _ADD_SUCEEDING_WS = False
     _BIND_PARAMS = True
+    __slots__ = ('_operator', '_value', 'inverse')
 
     def __init__(self, value=None, operator=None, inverse=False):
-        self.operator = operator or self.operator
+        self._operator = None
+        self._operator = operator or self.operator
         self.value = value
         self.inverse = inverse
 
@@ -1049,8 +2708,37 @@ class Operator(_BaseLink):
 
     value = property(_get_value, _set_value)
 
+    def _get_operator(self):
+        return self._operator
+
+    def _set_operator(self, operator):
+        self._operator = operator
+
+    # sub-classes define their operator as a class attribute, which takes the
+    # place of this property, the rendered operator is always self._operator
+    operator = property(_get_operator, _set_operator)
+
+    def _shape(self):
+        value = self._value
+
+        if isinstance(value, dict) and self._BIND_PARAMS:
+            value = shape(value, expand=True)
+        elif self._BIND_PARAMS:
+            value = shape(value)
+        else:
+            value = raw_shape(value)
+
+        if self.inverse:
+            value = '{}, inverse'.format(value)
+
+        return '{}:{}({})'.format(self.__class__.__name__, self._operator,
+            value)
+
+    def _is_volatile(self):
+        return isinstance(self._value, Partial)
+
     def __unicode__(self):
-        operator = self.operator
+        operator = self._operator
 
         if isinstance(self.value, (Pypher, Partial)):
             self.value.parent = self.parent
@@ -1107,44 +2795,65 @@ class Operator(_BaseLink):
 
 class OperatorRaw(Operator):
     _BIND_PARAMS = False
+    __slots__ = ()
 
 
 class AND(Operator):
     operator = 'AND'
+    __slots__ = ()
 
 
 class OR(Operator):
     operator = 'OR'
+    __slots__ = ()
 
 
 class Assign(Operator):
     operator = '='
+    __slots__ = ()
 
 
 class Alias(OperatorRaw):
     _ALIASES = ['AS',]
     operator = 'AS'
+    __slots__ = ()
 
 
 class Rexp(Operator):
     _ALIASES = ['re',]
     operator = '=~'
+    __slots__ = ()
 
 
 class Entity(_BaseLink):
+    """
+    The base of nodes and relationships. Every property is bound as its own
+    param unless map_param is set, then the properties are bound as one
+    param and rendered as {key: $props.key, ...}. Properties that have to be
+    rendered into the query, like other Pypher instances, are left as they
+    are.
+
+    :param str variable: the name of the entity
+    :param labels: a label or a list of labels
+    :param map_param: the name of the param or True to create one
+    :param properties: the properties of the entity
+    """
     _ADD_PRECEEDING_WS = False
     _ADD_SUCEEDING_WS = False
     _CLEAR_PRECEEDING_WS = False
     _LABEL_OPERATOR = '+'
+    __slots__ = ('variable', '_labels', '_properties', 'map_param')
 
-    def __init__(self, variable=None, labels=None, **properties):
+    def __init__(self, variable=None, labels=None, map_param=None,
+                 **properties):
         if not isinstance(labels, Label):
             labels = Label(labels)
 
         labels.operator = self._LABEL_OPERATOR
         self.variable = variable or ''
         self._labels = labels
-        self._properties = OrderedDict(sorted(properties.items()))
+        self._properties = tuple(sorted(properties.items()))
+        self.map_param = map_param
 
         super(Entity, self).__init__()
 
@@ -1162,26 +2871,64 @@ class Entity(_BaseLink):
 
         return variable
 
+    def _shape(self):
+        map_param = self.map_param
+        properties = ', '.join('{}: {}'.format(k,
+            '$map' if map_param and is_plain(v) else shape(v))
+            for k, v in self._properties)
+
+        return '{}({} {{{}}})'.format(self.__class__.__name__, self.labels,
+            properties)
+
     @property
     def properties(self):
-        properties = []
+        if not self._properties:
+            return ''
 
-        for k, v in self._properties.items():
-            name = self.params.param_name(k)
-            param = self.bind_param(value=v, name=name)
-            key = quote_propery(k)
+        mark = QUOTES['property']
 
-            properties.append('{key}: {val}'.format(key=key,
-                val=param.placeholder))
+        if self.map_param:
+            return self._map_param_properties(mark)
 
-        if properties:
-            return '{{{props}}}'.format(props=', '.join(properties))
+        # every property is bound in one batch, the keys are quoted inline
+        # instead of with quote_propery
+        placeholders = self.params.bind_many(self._properties, self)
 
-        return ''
+        return '{{{}}}'.format(', '.join(['{0}{1}{0}: {2}'.format(mark, k, p)
+            for (k, v), p in zip(self._properties, placeholders)]))
+
+    def _map_param_properties(self, mark):
+        values = {}
+        others = []
+
+        for k, v in self._properties:
+            if is_plain(v):
+                values[k] = v
+            else:
+                others.append((k, v))
+
+        name = None
+
+        if values:
+            name = bind_map_param(self, self.map_param, values)
+
+        placeholders = iter(self.params.bind_many(others, self))
+        properties = []
+
+        for k, v in self._properties:
+            if k in values:
+                value = '${1}.{0}{2}{0}'.format(mark, name, k)
+            else:
+                value = next(placeholders)
+
+            properties.append('{0}{1}{0}: {2}'.format(mark, k, value))
+
+        return '{{{}}}'.format(', '.join(properties))
 
 
 class Node(Entity):
     _ALIASES = ['n_',]
+    __slots__ = ()
 
     def __unicode__(self):
         properties = self.properties
@@ -1202,12 +2949,14 @@ class Relationship(Entity):
         'out': '-{}->',
     }
     _LABEL_OPERATOR = '|'
+    __slots__ = ('_direction', 'hops')
 
     def __init__(self, variable=None, labels=None, types=None, direction=None,
-                 hops=None, min_hops=None, max_hops=None, **properties):
+                 hops=None, min_hops=None, max_hops=None, map_param=None,
+                 **properties):
         labels = types or labels
         super(Relationship, self).__init__(variable=variable, labels=labels,
-            **properties)
+            map_param=map_param, **properties)
 
         self._direction = None
         self.direction = direction
@@ -1259,6 +3008,11 @@ class Relationship(Entity):
 
     direction = property(_get_direction, _set_direction)
 
+    def _shape(self):
+        entity = super(Relationship, self)._shape()
+
+        return '{} {}{}'.format(entity, self._direction, self.variable_length)
+
     def __unicode__(self):
         properties = self.properties
         labels = self.labels
@@ -1296,7 +3050,100 @@ class Anon(object):
 __ = Anon()
 
 
-# dynamically create all pre defined Statments and functions
+def _resolve(attr):
+    """
+    Function used to find what an attribute accessed on a Pypher instance
+    adds to the chain: a Property for a __name__ attribute, the registered
+    link class, or a Statement named after the attribute. The factory that
+    creates the link is cached by the attribute name, the cache is dropped
+    whenever a link class is registered and it stops growing once it holds
+    _RESOLVED_SIZE names.
+
+    :param str attr: the attribute name
+    :return: a callable that creates the link
+    """
+    attr_low = attr.lower()
+
+    if attr_low in _PENDING:
+        _create_pending(attr_low)
+
+    # the cache is read before the registry, a class registered in between
+    # only drops the cache that the result is stored in
+    cache = _RESOLVED
+    link_class = _LINKS.get(attr_low, None)
+
+    if attr_low[:2] == '__' and attr_low[-2:] == '__':
+        factory = functools.partial(Property, name=attr.strip('__'))
+    elif link_class is not None:
+        factory = link_class
+    else:
+        factory = functools.partial(Statement, name=attr)
+
+    if len(cache) < _RESOLVED_SIZE:
+        cache[attr] = factory
+
+    return factory
+
+
+def _add_pending(name, create, kwargs):
+    _PENDING_LINKS[name] = (create, kwargs)
+    _PENDING.setdefault(name.lower(), []).append(name)
+    _export(name)
+
+
+def _create_pending(name):
+    """
+    Function used to create a pre defined Statement or Func class the first
+    time that it is used. Every pending class that shares its lower case name
+    is created with it, in the order that they were defined, so that the same
+    class ends up registered for that name as if they were all created when
+    the module was imported.
+
+    :param str name: the name of the class or its lower case name
+    :return: None
+    """
+    key = name.lower()
+
+    with _REGISTRY_LOCK:
+        names = _PENDING.get(key, None)
+
+        # nothing is pending, or this thread is already creating the classes
+        # and a link class that it created looked them up
+        if not names:
+            return
+
+        # the name is left pending, with nothing left to create, until the
+        # classes are registered. Other threads that look it up wait on the
+        # lock instead of falling back to a Statement
+        _PENDING[key] = ()
+
+        try:
+            for pending in names:
+                create, kwargs = _PENDING_LINKS[pending]
+                create(name=pending, **kwargs)
+                del _PENDING_LINKS[pending]
+        finally:
+            del _PENDING[key]
+
+
+def __getattr__(name):
+    # pre defined classes are created the first time that they are accessed
+    # on the module, see _create_pending
+    if name in _PENDING_LINKS:
+        _create_pending(name)
+
+        return _MODULE.__dict__[name]
+
+    raise AttributeError('module {} has no attribute {}'.format(__name__,
+        name))
+
+
+def __dir__():
+    return sorted(set(globals()) | set(_PENDING_LINKS))
+
+
+# the pre defined Statements and functions are created lazily, the first time
+# that they are used in a Pypher instance or accessed on the module
 for state in _PREDEFINED_STATEMENTS:
     name = state[0]
 
@@ -1305,7 +3152,7 @@ for state in _PREDEFINED_STATEMENTS:
     except Exception as e:
         attrs = {}
 
-    create_statement(name=name, attrs=attrs)
+    _add_pending(name, create_statement, {'attrs': attrs})
 
 
 for fun in _PREDEFINED_FUNCTIONS:
@@ -1321,4 +3168,20 @@ for fun in _PREDEFINED_FUNCTIONS:
     except Exception as e:
         func_raw = False
 
-    create_function(name=name, attrs=attrs, func_raw=func_raw)
+    _add_pending(name, create_function, {'attrs': attrs,
+        'func_raw': func_raw})
+
+
+# names that would replace a class that already exists are created now, as is
+# everything on versions of python that do not support a module __getattr__
+for key, names in list(_PENDING.items()):
+    if (sys.version_info < (3, 7) or key in _LINKS
+        or any(name in _MODULE.__dict__ for name in names)):
+        _create_pending(key)
+
+
+# a star import only reads the module's __dict__ unless __all__ is defined,
+# it lists every public name, including the pre defined classes that are not
+# created yet, so that they are created when they are star imported
+__all__ = sorted(set(name for name in globals() if name[0] != '_')
+    | set(_PENDING_LINKS))
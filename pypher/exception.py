@@ -10,3 +10,11 @@ class PypherAliasException(PypherException):
 
 class PypherArgumentException(PypherException, ValueError):
     pass
+
+
+class PypherBudgetException(PypherException):
+    pass
+
+
+class PypherBudgetWarning(UserWarning):
+    pass
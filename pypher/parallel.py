@@ -0,0 +1,129 @@
+import multiprocessing
+
+from collections import deque
+from itertools import islice
+
+from .builder import Pypher
+from .exception import PypherArgumentException
+from .partial import Partial
+
+
+DEFAULT_CHUNK_SIZE = 100
+
+
+def compile_item(item):
+    """
+    Function used to compile a single item of a batch. The item can be a
+    Pypher instance, a Partial, or a callable. A callable is given a new
+    Pypher instance to build the query on, if it returns a Pypher instance or
+    a Partial that is compiled instead.
+
+    :param item: the query to compile
+    :return: the compiled query
+    :rtype: Compiled
+    """
+    if not isinstance(item, (Pypher, Partial)):
+        if not callable(item):
+            error = ('The item: {} must be a Pypher instance, a Partial, or a'
+                ' callable'.format(item))
+
+            raise PypherArgumentException(error)
+
+        pypher = Pypher()
+        result = item(pypher)
+        item = pypher if result is None else result
+
+        if not isinstance(item, (Pypher, Partial)):
+            error = ('The callable returned: {}, it must return None, a Pypher'
+                ' instance, or a Partial'.format(item))
+
+            raise PypherArgumentException(error)
+
+    return item.compile()
+
+
+def _compile_chunk(chunk):
+    return [compile_item(item) for item in chunk]
+
+
+def _chunks(items, chunk_size):
+    items = iter(items)
+
+    while True:
+        chunk = list(islice(items, chunk_size))
+
+        if not chunk:
+            return
+
+        yield chunk
+
+
+def compile_many(items, workers=None, chunk_size=None, executor=None):
+    """
+    Generator used to compile a large number of independent queries in a
+    pool of processes. Rendering is pure Python work, this spreads it over
+    every core instead of running it on the one that holds the GIL:
+
+        def build_user(user_id, pypher):
+            pypher.MATCH.node('u', 'User', id=user_id).RETURN.u
+
+        items = (functools.partial(build_user, i) for i in ids)
+
+        for cypher, params in compile_many(items):
+            session.run(cypher, params)
+
+    The items are sent to the workers in chunks of chunk_size and the
+    Compiled results are yielded in the same order as the items as soon as
+    their chunk is done. The items are consumed lazily, only a few chunks per
+    worker are sent ahead of the results that were already yielded.
+
+    Every item is pickled to be sent to a worker, callables must be defined
+    at the module level (or be functools.partial objects of one), see
+    compile_item for the items that are accepted.
+
+    :param items: an iterable of Pypher instances, Partials, or callables
+    :param int workers: the number of processes, defaults to the number of
+        cpus
+    :param int chunk_size: the number of items that are sent to a worker at
+        once
+    :param executor: a concurrent.futures executor to use instead of creating
+        a process pool, it is not shut down when the batch is done
+    :return: a generator of Compiled objects
+    """
+    if chunk_size is None:
+        chunk_size = DEFAULT_CHUNK_SIZE
+
+    if chunk_size < 1:
+        error = 'The chunk_size: {} must be at least 1'.format(chunk_size)
+
+        raise PypherArgumentException(error)
+
+    workers = workers or multiprocessing.cpu_count()
+    own_executor = executor is None
+
+    if own_executor:
+        from concurrent.futures import ProcessPoolExecutor
+
+        executor = ProcessPoolExecutor(max_workers=workers)
+
+    chunks = _chunks(items, chunk_size)
+    pending = deque()
+
+    try:
+        for chunk in islice(chunks, workers * 2):
+            pending.append(executor.submit(_compile_chunk, chunk))
+
+        while pending:
+            results = pending.popleft().result()
+
+            for chunk in islice(chunks, 1):
+                pending.append(executor.submit(_compile_chunk, chunk))
+
+            for compiled in results:
+                yield compiled
+    finally:
+        for future in pending:
+            future.cancel()
+
+        if own_executor:
+            executor.shutdown(wait=True)
@@ -1,5 +1,8 @@
 
 
+import threading
+
+
 class Partial(object):
 
     def __init__(self, *args, **kwargs):
@@ -30,6 +33,65 @@ class Partial(object):
 
     parent = property(_get_parent, _set_parent)
 
+    def _get_lock(self):
+        # building, rendering, and resetting the partial changes its Pypher
+        # instance, a partial that is shared by several queries is used by
+        # one thread at a time. The query that it is in is always locked
+        # before it, see builder._Rendering. The lock is created on first use
+        # because sub-classes do not always call __init__
+        lock = self.__dict__.get('_lock', None)
+
+        if lock is None:
+            lock = self.__dict__.setdefault('_lock', threading.RLock())
+
+        return lock
+
+    @property
+    def fingerprint(self):
+        from .builder import _Rendering
+
+        with _Rendering(self.pypher.params), self._get_lock():
+            built = self._built
+            self._build_cypher()
+            fingerprint = self.pypher.fingerprint
+
+            if not built:
+                self.pypher.reset()
+                self._built = False
+
+        return fingerprint
+
+    def compile(self):
+        """
+        Method used to build the partial and compile it into an immutable
+        (cypher, params) result. See Pypher.compile
+
+        :return: the compiled query
+        :rtype: Compiled
+        """
+        from .builder import _Rendering
+
+        with _Rendering(self.pypher.params), self._get_lock():
+            self._build_cypher()
+
+            compiled = self.pypher.compile()
+
+            self.pypher.reset()
+            self._built = False
+
+        return compiled
+
+    # __getattr__ adds links, the state has to be read and written directly
+    # so that partials can be pickled
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        state.pop('_lock', None)
+
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+
     def build(self):
         raise NotImplementedError('Pypher partial classes need a build method')
 
@@ -45,12 +107,15 @@ class Partial(object):
         return self.__unicode__()
 
     def __unicode__(self):
-        self._build_cypher()
+        from .builder import _Rendering
 
-        string = str(self.pypher)
+        with _Rendering(self.pypher.params), self._get_lock():
+            self._build_cypher()
 
-        self.pypher.reset()
-        self._built = False
+            string = str(self.pypher)
+
+            self.pypher.reset()
+            self._built = False
 
         return string
 
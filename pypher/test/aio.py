@@ -0,0 +1,221 @@
+import asyncio
+import functools
+import threading
+import unittest
+
+from concurrent.futures import ThreadPoolExecutor
+
+from pypher.aio import (Pipeline, MemoryExecutor, QueryExecutor,
+    compile_async, is_large)
+from pypher.builder import Pypher, Compiled, Func, __
+from pypher.exception import PypherArgumentException
+from pypher.partial import Case
+
+
+def run(coroutine):
+    loop = asyncio.new_event_loop()
+
+    try:
+        return loop.run_until_complete(coroutine)
+    finally:
+        loop.close()
+
+
+def build_user(user_id, pypher):
+    pypher.MATCH.node('u', 'User', id=user_id).RETURN.u
+
+
+def user_id(cypher, params):
+    return list(params.values())[0]
+
+
+def long_query(size):
+    p = Pypher()
+
+    for i in range(size):
+        p.link('n{}'.format(i))
+
+    return p
+
+
+class SlowFunc(Func):
+    """
+    A function that blocks its render until released, it stands in for a
+    query that takes a long time to render.
+    """
+    name = 'slow'
+    entered = threading.Event()
+    release = threading.Event()
+
+    def __unicode__(self):
+        self.entered.set()
+        self.release.wait(5)
+
+        return super(SlowFunc, self).__unicode__()
+
+
+class RecordingThreadPool(ThreadPoolExecutor):
+
+    def __init__(self, *args, **kwargs):
+        super(RecordingThreadPool, self).__init__(*args, **kwargs)
+        self.threads = set()
+
+    def submit(self, fn, *args, **kwargs):
+        def record(*args, **kwargs):
+            self.threads.add(threading.current_thread())
+
+            return fn(*args, **kwargs)
+
+        return super(RecordingThreadPool, self).submit(record, *args,
+            **kwargs)
+
+
+class CompileAsyncTests(unittest.TestCase):
+
+    def test_can_tell_if_query_is_large(self):
+        self.assertFalse(is_large(long_query(3), 4))
+        self.assertTrue(is_large(long_query(4), 4))
+        self.assertTrue(is_large(Case(__.n.__eyes__)))
+        self.assertTrue(is_large(functools.partial(build_user, 1)))
+
+    def test_will_compile_small_query_on_loop(self):
+        p = long_query(2)
+
+        with RecordingThreadPool(max_workers=1) as pool:
+            compiled = run(compile_async(p, pool, large_query=3))
+
+        self.assertIsInstance(compiled, Compiled)
+        self.assertEqual(str(p), compiled.cypher)
+        self.assertEqual(set(), pool.threads)
+
+    def test_will_compile_large_query_in_executor(self):
+        p = long_query(3)
+
+        with RecordingThreadPool(max_workers=1) as pool:
+            compiled = run(compile_async(p, pool, large_query=3))
+
+        self.assertEqual(str(p), compiled.cypher)
+        self.assertEqual(1, len(pool.threads))
+        self.assertNotIn(threading.current_thread(), pool.threads)
+
+    def test_loop_is_not_blocked_while_large_query_compiles(self):
+        large = Pypher()
+        large.RETURN.SlowFunc(1)
+        SlowFunc.entered.clear()
+        SlowFunc.release.clear()
+
+        async def compile_while_large_query_renders(pool):
+            loop = getattr(asyncio, 'get_running_loop',
+                asyncio.get_event_loop)()
+            task = asyncio.ensure_future(compile_async(large, pool,
+                large_query=1))
+
+            while not SlowFunc.entered.is_set():
+                await asyncio.sleep(0.001)
+
+            # small queries are compiled on the loop while the large one is
+            # still being rendered in the executor
+            gaps = []
+            last = loop.time()
+
+            for i in range(10):
+                compiled = await compile_async(long_query(2), pool)
+                await asyncio.sleep(0.001)
+                now = loop.time()
+                gaps.append(now - last)
+                last = now
+
+            done = task.done()
+            SlowFunc.release.set()
+            await task
+
+            return compiled, done, max(gaps)
+
+        try:
+            with ThreadPoolExecutor(max_workers=1) as pool:
+                compiled, done, gap = run(
+                    compile_while_large_query_renders(pool))
+        finally:
+            SlowFunc.release.set()
+
+        self.assertEqual('n0 n1', compiled.cypher)
+        self.assertFalse(done)
+        self.assertLess(gap, 1)
+
+
+class PipelineTests(unittest.TestCase):
+
+    def test_can_run_queries_in_order(self):
+        executor = MemoryExecutor(result=user_id)
+        pipeline = Pipeline(executor, concurrency=3)
+        items = [functools.partial(build_user, i) for i in range(10)]
+        results = run(pipeline.run_all(items))
+
+        self.assertEqual(list(range(10)), results)
+        self.assertEqual(10, len(executor.queries))
+
+    def test_will_limit_queries_in_flight(self):
+        executor = MemoryExecutor(delay=0.001)
+        pipeline = Pipeline(executor, concurrency=4)
+        items = [functools.partial(build_user, i) for i in range(20)]
+        run(pipeline.run_all(items))
+
+        self.assertEqual(4, executor.max_in_flight)
+        self.assertEqual(0, executor.in_flight)
+
+    def test_submit_waits_for_free_slot(self):
+        executor = MemoryExecutor(delay=0.01)
+        pipeline = Pipeline(executor, concurrency=2)
+
+        async def submit():
+            tasks = [await pipeline.submit(long_query(1)) for _ in range(2)]
+            blocked = asyncio.ensure_future(pipeline.submit(long_query(1)))
+            await asyncio.sleep(0)
+            waiting = not blocked.done()
+            tasks.append(await blocked)
+            await asyncio.gather(*tasks)
+
+            return waiting
+
+        self.assertTrue(run(submit()))
+        self.assertEqual(3, len(executor.queries))
+        self.assertEqual(2, executor.max_in_flight)
+
+    def test_will_consume_items_lazily(self):
+        consumed = []
+
+        def items():
+            for i in range(100):
+                consumed.append(i)
+
+                yield functools.partial(build_user, i)
+
+        pipeline = Pipeline(MemoryExecutor(), concurrency=5)
+
+        async def first():
+            results = pipeline.run(items())
+            result = await results.__anext__()
+            await results.aclose()
+
+            return result
+
+        run(first())
+
+        self.assertLess(len(consumed), 10)
+
+    def test_will_raise_executor_errors(self):
+        def fail(cypher, params):
+            raise ValueError(cypher)
+
+        pipeline = Pipeline(MemoryExecutor(result=fail))
+
+        with self.assertRaises(ValueError):
+            run(pipeline.run_all([long_query(1)]))
+
+    def test_query_executor_needs_run_method(self):
+        with self.assertRaises(NotImplementedError):
+            run(Pipeline(QueryExecutor()).execute(long_query(1)))
+
+    def test_cannot_use_invalid_concurrency(self):
+        with self.assertRaises(PypherArgumentException):
+            Pipeline(MemoryExecutor(), concurrency=-1)
@@ -0,0 +1,97 @@
+import unittest
+
+from pypher.batch import UnwindBatch
+from pypher.builder import __
+from pypher.exception import PypherArgumentException
+
+
+def merge_user(pypher, alias):
+    pypher.MERGE.node('u', 'User', id=getattr(__, alias).__id__)
+    pypher.SET.u += getattr(__, alias)
+
+
+class MergeUsers(UnwindBatch):
+
+    def build(self, pypher, alias):
+        merge_user(pypher, alias)
+
+
+class UnwindBatchTests(unittest.TestCase):
+
+    def test_can_create_unwind_query(self):
+        batch = UnwindBatch([], merge_user)
+        exp = ('UNWIND $rows AS row MERGE (u:`User` {`id`: row.`id`})'
+            ' SET u += row')
+
+        self.assertEqual(exp, batch.cypher)
+
+    def test_can_chunk_rows(self):
+        rows = [{'id': i} for i in range(7)]
+        batch = UnwindBatch(rows, merge_user, chunk_size=3)
+        results = list(batch)
+
+        self.assertEqual(3, len(results))
+        self.assertEqual([rows[0:3], rows[3:6], rows[6:]],
+            [params['rows'] for cypher, params in results])
+
+        for cypher, params in results:
+            self.assertEqual(batch.cypher, cypher)
+
+    def test_can_consume_rows_lazily(self):
+        consumed = []
+
+        def rows():
+            for i in range(10):
+                consumed.append(i)
+
+                yield {'id': i}
+
+        batch = iter(UnwindBatch(rows(), merge_user, chunk_size=4))
+        next(batch)
+
+        self.assertEqual(4, len(consumed))
+
+    def test_can_use_custom_param_and_alias_names(self):
+        batch = UnwindBatch([{'id': 1}], merge_user, param='users',
+            alias='user')
+        cypher, params = next(iter(batch))
+        exp = ('UNWIND $users AS user MERGE (u:`User` {`id`: user.`id`})'
+            ' SET u += user')
+
+        self.assertEqual(exp, cypher)
+        self.assertEqual([{'id': 1}], params['users'])
+
+    def test_can_keep_params_bound_in_build(self):
+        def build(pypher, alias):
+            pypher.MERGE.node('u', 'User', id=__.row.__id__)
+            pypher.SET.u.__source__ == 'import'
+
+        batch = UnwindBatch([{'id': 1}], build)
+        cypher, params = next(iter(batch))
+
+        self.assertIn('import', params.values())
+        self.assertEqual([{'id': 1}], params['rows'])
+
+    def test_can_subclass_batch(self):
+        batch = MergeUsers([{'id': 1}, {'id': 2}], chunk_size=1)
+
+        self.assertEqual(2, len(list(batch)))
+
+    def test_will_raise_error_without_build(self):
+        batch = UnwindBatch([{'id': 1}])
+
+        self.assertRaises(NotImplementedError, list, batch)
+
+    def test_will_raise_error_for_invalid_chunk_size(self):
+        def create(chunk_size):
+            UnwindBatch([], merge_user, chunk_size=chunk_size)
+
+        self.assertRaises(PypherArgumentException, create, -1)
+        self.assertRaises(PypherArgumentException, create, 0)
+
+    def test_will_not_yield_for_empty_rows(self):
+        self.assertEqual([], list(UnwindBatch([], merge_user)))
+
+
+if __name__ == '__main__':
+    unittest.main()
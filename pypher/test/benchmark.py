@@ -0,0 +1,68 @@
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import unittest
+
+from pypher import benchmark
+
+
+class BenchmarkTests(unittest.TestCase):
+
+    def test_can_run_every_case(self):
+        results = list(benchmark.run(sizes=[1, 3], repeat=1))
+        cases = set(r['case'] for r in results)
+
+        self.assertEqual(set(benchmark.CASES), cases)
+        self.assertEqual(len(benchmark.CASES) * 2, len(results))
+
+        for result in results:
+            self.assertEqual(1, result['repeat'])
+            self.assertGreaterEqual(result['best'], 0)
+
+    def test_threads_case_does_not_keep_its_function(self):
+        from pypher import builder
+
+        list(benchmark.run(names=['threads'], sizes=[3], repeat=1))
+
+        self.assertIs(builder.Match, builder._LINKS['match'])
+        self.assertNotIn('pypher_bench_func', builder._LINKS)
+        self.assertNotIn('pypher_bench_func', builder.__dict__)
+        self.assertNotIn('pypher_bench_func', builder.__all__)
+
+    def test_threads_case_keeps_classes_created_while_it_runs(self):
+        # the predefined classes are created the first time that they are
+        # used, a fresh process is needed for the case to create them
+        script = (
+            'from pypher import benchmark, builder\n'
+            'list(benchmark.run(names=["threads"], sizes=[3], repeat=1))\n'
+            'print(builder._LINKS.get("match") is builder.Match)\n'
+            'print(builder._LINKS.get("where") is builder.Where)\n')
+        root = os.path.dirname(os.path.dirname(
+            os.path.abspath(benchmark.__file__)))
+        output = subprocess.check_output([sys.executable, '-c', script],
+            cwd=root)
+
+        self.assertEqual(['True', 'True'], output.decode().split())
+
+    def test_can_run_selected_case_and_write_json_lines(self):
+        fd, path = tempfile.mkstemp()
+        os.close(fd)
+
+        try:
+            benchmark.main(['--case', 'add_link', '--case', 'render',
+                '--sizes', '2,4', '--repeat', '2', '--output', path])
+
+            with open(path) as output:
+                results = [json.loads(line) for line in output]
+        finally:
+            os.remove(path)
+
+        self.assertEqual(['add_link', 'add_link', 'render', 'render'],
+            [r['case'] for r in results])
+        self.assertEqual([2, 4, 2, 4], [r['size'] for r in results])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,10 +1,24 @@
+from datetime import date
+from decimal import Decimal
 from random import randrange, random, randint
 
+import copy
+import pickle
+import sys
+import threading
 import unittest
 import re
+import warnings
 
 from pypher.builder import (Pypher, Statement, _PREDEFINED_STATEMENTS,
-    _PREDEFINED_FUNCTIONS, __, Param, Params, Func, Statement)
+    _PREDEFINED_FUNCTIONS, __, Param, Params, Func, Statement, Template,
+    UNBOUND, Compiled, BUDGET)
+from pypher.exception import (PypherArgumentException, PypherBudgetException,
+    PypherBudgetWarning)
+
+
+class Name(str):
+    pass
 
 
 def get_dict_key(dict, value):
@@ -37,6 +51,129 @@ class BuilderTests(unittest.TestCase):
 
         self.assertEqual(str(p), ' '.join(expected))
 
+    def test_predefined_classes_are_created_when_first_used(self):
+        from pypher import builder
+
+        builder._add_pending('LazyStatement', builder.create_statement,
+            {'attrs': {'name': 'LAZY STATEMENT'}})
+
+        self.assertNotIn('LazyStatement', builder.__dict__)
+        self.assertNotIn('lazystatement', builder._LINKS)
+        self.assertIn('LazyStatement', dir(builder))
+
+        p = Pypher()
+        p.lazystatement(__.n)
+
+        self.assertEqual('LAZY STATEMENT n', str(p))
+        self.assertIn('LazyStatement', builder.__dict__)
+        self.assertNotIn('LazyStatement', builder._PENDING_LINKS)
+
+    def test_predefined_classes_are_created_when_accessed_on_module(self):
+        from pypher import builder
+
+        builder._add_pending('LazyFunc', builder.create_function,
+            {'attrs': {'name': 'lazy'}})
+        lazy = builder.LazyFunc
+
+        self.assertTrue(issubclass(lazy, Func))
+        self.assertIs(lazy, builder._LINKS['lazyfunc'])
+
+    def test_predefined_classes_are_created_when_star_imported(self):
+        from pypher import builder
+
+        builder._add_pending('LazyStar', builder.create_statement, {})
+        namespace = {}
+        exec('from pypher.builder import *', namespace)
+
+        self.assertIs(builder.LazyStar, namespace['LazyStar'])
+        self.assertIs(builder.Pypher, namespace['Pypher'])
+
+        for name in ('Match', 'Return', 'count'):
+            self.assertIn(name, namespace)
+
+    def test_custom_class_replaces_pending_predefined_class(self):
+        from pypher import builder
+
+        builder._add_pending('LazyReplaced', builder.create_statement, {})
+
+        class LazyReplaced(Statement):
+            _CAPITALIZE = False
+
+        p = Pypher()
+        p.lazyreplaced
+
+        self.assertIsInstance(p.next, LazyReplaced)
+        self.assertIsNot(LazyReplaced, builder.LazyReplaced)
+        self.assertEqual('LazyReplaced', str(p))
+
+    def test_alias_cannot_clash_with_pending_predefined_class(self):
+        from pypher import builder
+        from pypher.exception import PypherAliasException
+
+        builder._add_pending('LazyClash', builder.create_statement, {})
+
+        with self.assertRaises(PypherAliasException):
+            class LazyClashAlias(Statement):
+                _ALIASES = ['lazyclash']
+
+    def test_create_function_does_not_change_the_attrs(self):
+        from pypher import builder
+
+        attrs = {'name': 'shared_attrs'}
+        builder.create_function('SharedAttrsFunc', attrs)
+        builder.create_statement('SharedAttrsStatement', attrs)
+
+        self.assertEqual({'name': 'shared_attrs'}, attrs)
+        self.assertEqual((), builder.SharedAttrsFunc.__slots__)
+
+    def test_attribute_resolution_is_cached(self):
+        from pypher import builder
+
+        p = Pypher()
+        p.MATCH.cached_name.__cached_prop__
+
+        self.assertIs(builder._RESOLVED['MATCH'], builder._LINKS['match'])
+        self.assertIn('cached_name', builder._RESOLVED)
+        self.assertIn('__cached_prop__', builder._RESOLVED)
+
+        p.MATCH.cached_name.__cached_prop__
+
+        self.assertEqual('MATCH cached_name.`cached_prop` MATCH'
+            ' cached_name.`cached_prop`', str(p))
+
+    def test_registering_link_drops_cached_resolution(self):
+        from pypher import builder
+
+        p = Pypher()
+        p.resolved_later(1)
+
+        self.assertIsInstance(p.next, Statement)
+
+        builder.create_function('resolved_later', {'name': 'resolvedLater'})
+        p = Pypher()
+        p.resolved_later(1)
+
+        cypher = str(p)
+
+        self.assertIsInstance(p.next, Func)
+        self.assertEqual('resolvedLater(${})'.format(
+            get_dict_key(p.bound_params, 1)), cypher)
+
+    def test_resolution_cache_is_bounded(self):
+        from pypher import builder
+
+        size = builder._RESOLVED_SIZE
+        builder._RESOLVED_SIZE = len(builder._RESOLVED)
+
+        try:
+            p = Pypher()
+            p.not_cached_name
+
+            self.assertNotIn('not_cached_name', builder._RESOLVED)
+            self.assertEqual('not_cached_name', str(p))
+        finally:
+            builder._RESOLVED_SIZE = size
+
     def test_pypher_can_create_dynamic_statment(self):
         p = Pypher()
         p.my_statement(1, 2, 3)
@@ -746,6 +883,66 @@ class BuilderTests(unittest.TestCase):
         self.assertEqual(exp3, s3)
         self.assertEqual(exp4, s4)
 
+    def test_can_append_and_keep_adding_links(self):
+        p = Pypher()
+        p2 = Pypher()
+        p.one
+        p2.two.three
+
+        p.append(p2)
+        p.four.five
+
+        self.assertEqual('one two three four five', str(p))
+        self.assertEqual('five', str(p._bottom))
+
+    def test_can_build_long_chain_with_tracked_tail(self):
+        p = Pypher()
+        size = 2000
+
+        for i in range(size):
+            p.link('s{}'.format(i))
+
+        exp = ' '.join('s{}'.format(i) for i in range(size))
+
+        self.assertEqual(exp, str(p))
+        self.assertEqual('s{}'.format(size - 1), str(p._bottom))
+
+    def test_can_call_last_link_of_long_chain(self):
+        p = Pypher()
+
+        for i in range(500):
+            p.link('s{}'.format(i))
+
+        p.count(1)
+        p.tail
+
+        s = str(p)
+        params = p.bound_params
+
+        self.assertTrue(s.endswith('s499 count(${}) tail()'.format(
+            get_dict_key(params, 1))))
+
+    def test_can_remove_links_and_keep_tail(self):
+        p = Pypher()
+        p.one.two.three
+        two = p.next.next
+        three = p._bottom
+
+        p.remove_link(three)
+        p.four
+        p.remove_link(two)
+        p.five
+
+        self.assertEqual('one four five', str(p))
+
+    def test_can_remove_first_link(self):
+        p = Pypher()
+        p.one.two
+        p.remove_link(p.next)
+        p.three
+
+        self.assertEqual('two three', str(p))
+
     def test_can_use_base_conditional(self):
         p = Pypher()
         p.CONDITIONAL(1, 2, 3)
@@ -831,6 +1028,227 @@ class BuilderTests(unittest.TestCase):
 
         self.assertTrue(before != after)
 
+    def test_links_do_not_have_a_dict(self):
+        p = Pypher()
+        p.MATCH.node('n', 'Label', id=1).rel_out(labels='KNOWS').node('m')
+        p.WHERE.n.__name__ == 'name'
+        p.RETURN.count(__.m).AS('total')
+        link = p.next
+
+        while link:
+            # hasattr would add a link through __getattr__
+            with self.assertRaises(AttributeError):
+                object.__getattribute__(link, '__dict__')
+
+            link = link.next
+
+    def test_links_share_the_params_of_the_root(self):
+        p = Pypher()
+        p.MATCH.node('n', id=1).WHERE.n.__name__ == 'name'
+        str(p)
+        link = p.next
+
+        while link:
+            self.assertIs(p.params, link.params)
+            self.assertIsNone(link._params)
+            link = link.next
+
+    def test_link_params_are_merged_into_the_parent(self):
+        p = Pypher()
+        link = Statement(name='a')
+        param = link.bind_param('value', 'name')
+        p.add_link(link)
+
+        self.assertIs(p.params, link.params)
+        self.assertEqual('value', p.bound_params[param.name])
+
+    def test_can_use_underscore_after_slots(self):
+        p = Pypher()
+        p.MATCH._.node('n')
+
+        self.assertIs(p, p._)
+        self.assertEqual('MATCH (n)', str(p))
+
+    def test_can_augment_assign_slotted_links(self):
+        p = Pypher()
+        p.SET.n += 1
+        s = str(p)
+        params = get_dict_key(p.bound_params, 1)
+
+        self.assertEqual('SET n += ${}'.format(params), s)
+
+    def test_can_clone_slotted_links(self):
+        p = Pypher()
+        p.MATCH.node('n', 'Label', id=1).rel(labels='KNOWS', hops=2)
+        p.WHERE.n.__name__ == 'name'
+        p.RETURN.map_projection('n', 'one', two=2).AS('m')
+        c = p.clone()
+
+        self.assertEqual(str(p), str(c))
+        self.assertEqual(dict(p.bound_params), dict(c.bound_params))
+        self.assertIsNot(p.params, c.params)
+        self.assertEqual(p.params.prefix, c.params.prefix)
+
+    def test_custom_links_without_slots_keep_a_dict(self):
+
+        class DictStatement(Statement):
+            _CAPITALIZE = False
+
+            def __init__(self, *args, **kwargs):
+                self.extra = 'extra'
+                super(DictStatement, self).__init__(*args, **kwargs)
+
+        p = Pypher()
+        p.dictstatement.a.b
+        c = p.clone()
+        shared = list(c.iter_links())
+        c.remove_link(shared[1])
+
+        self.assertEqual('extra', shared[0].extra)
+        self.assertIsNot(shared[0], c.next)
+        self.assertEqual('extra', c.next.extra)
+        self.assertEqual('DictStatement b', str(c))
+        self.assertEqual('DictStatement a b', str(p))
+
+    def test_fragments_join_to_the_cypher_string(self):
+        queries = [Pypher() for _ in range(4)]
+        queries[0].MATCH.node('n', 'User', id=1).rel_out(labels='KNOWS')
+        queries[0].node('m').WHERE.n.__name__ == 'name'
+        queries[1].n.__name__.label('x').RETURN.map(one=1).node('n')
+        queries[2].label('x')
+        queries[3].RETURN.n.__name__.AS('name').ORDER_BY(__.n.__age__).DESC
+
+        for p in queries:
+            fragments = list(p.iter_fragments())
+
+            self.assertEqual(''.join(fragments), str(p))
+
+    def test_fragments_do_not_start_or_end_with_whitespace(self):
+        p = Pypher()
+        p.MATCH.node('n').RETURN.n.label(None)
+        fragments = list(p.iter_fragments())
+
+        self.assertEqual('MATCH', fragments[0])
+        self.assertEqual('n', fragments[-1])
+
+    def test_can_write_pypher_to_a_file(self):
+        from io import StringIO
+
+        p = Pypher()
+        p.MATCH.node('n', 'User', id=1).RETURN.n
+        fp = StringIO()
+        written = p.write(fp)
+        params = p.bound_params
+
+        self.assertEqual(str(p), fp.getvalue())
+        self.assertEqual(len(fp.getvalue()), written)
+        self.assertEqual(1, len(params))
+
+        fp = StringIO()
+        p.write(fp)
+
+        self.assertEqual(str(p), fp.getvalue())
+
+    def test_will_reuse_cypher_for_unchanged_pypher(self):
+        renders = []
+
+        class CountedFunc(Func):
+            name = 'counted'
+
+            def __unicode__(self):
+                renders.append(1)
+
+                return super(CountedFunc, self).__unicode__()
+
+        p = Pypher()
+        p.MATCH.node('n').RETURN.CountedFunc(1)
+        first = str(p)
+        params = p.bound_params
+        second = str(p)
+
+        self.assertEqual(first, second)
+        self.assertEqual(params, p.bound_params)
+        self.assertEqual(1, len(renders))
+
+        p.LIMIT(2)
+        third = str(p)
+
+        self.assertEqual(first + ' LIMIT 2', third)
+        self.assertEqual(2, len(renders))
+
+    def test_will_rebuild_cypher_when_nested_pypher_changes(self):
+        p = Pypher()
+        q = Pypher()
+        q.a
+        p.RETURN(q)
+        first = str(p)
+        q.b
+        second = str(p)
+
+        self.assertEqual('RETURN a', first)
+        self.assertEqual('RETURN a b', second)
+
+    def test_will_rebuild_cypher_when_shared_nested_pypher_changes(self):
+        sub = __.n.__x__ == 1
+        p1 = Pypher()
+        p1.WHERE(sub)
+        p2 = Pypher()
+        p2.WHERE(sub)
+        str(p1)
+        str(p2)
+        sub.AND(__.n.__y__ == 2)
+
+        self.assertIn('AND n.`y`', str(p1))
+        self.assertIn('AND n.`y`', str(p2))
+
+    def test_will_rebuild_cypher_of_clone_when_nested_pypher_changes(self):
+        sub = __.n.__x__
+        p = Pypher()
+        p.RETURN(sub)
+        c = p.clone()
+        str(p)
+        str(c)
+        sub.AS('x')
+
+        self.assertEqual('RETURN n.`x` AS x', str(p))
+        self.assertEqual('RETURN n.`x` AS x', str(c))
+
+    def test_will_rebuild_cypher_when_deeply_nested_pypher_changes(self):
+        inner = __.n.__x__
+        outer = __.collect(inner)
+        p1 = Pypher()
+        p1.RETURN(outer)
+        p2 = Pypher()
+        p2.WITH(inner)
+        str(p1)
+        str(p2)
+        inner.AS('x')
+
+        self.assertEqual('RETURN collect(n.`x` AS x)', str(p1))
+
+    def test_will_rebuild_cypher_when_params_are_reset(self):
+        p = Pypher()
+        p.WHERE.n.__name__ == 'mark'
+        first = str(p)
+        p.params.reset()
+        second = str(p)
+
+        self.assertEqual(first, second)
+        self.assertEqual(1, len(p.bound_params))
+
+    def test_will_rebuild_cypher_when_quotes_change(self):
+        import pypher
+
+        p = Pypher()
+        p.n.__name__
+        first = str(p)
+        pypher.builder.QUOTES['property'] = '"'
+        second = str(p)
+        pypher.builder.QUOTES['property'] = '`'
+
+        self.assertEqual('n.`name`', first)
+        self.assertEqual('n."name"', second)
+
     def test_can_do_bitwise_and(self):
         p = Pypher()
         p.BAND(12, 4)
@@ -1633,8 +2051,8 @@ class ParamTests(unittest.TestCase):
         self.assertNotEqual(id(v), id(param))
         self.assertIn(v.value, params.values())
         self.assertIn(n, params)
-        self.assertEqual(1, len(params))
-        self.assertEqual(param.name, param2.name)
+        self.assertEqual(2, len(params))
+        self.assertNotEqual(param.name, param2.name)
 
     def test_can_ensure_that_a_value_the_same_as_a_previously_bound_param_returns_previous_params_value(self):
         n = 'some_name'
@@ -1649,6 +2067,245 @@ class ParamTests(unittest.TestCase):
         self.assertEqual(1, len(params))
         self.assertEqual(param.name, param2.name)
 
+    def test_generated_param_names_are_numbered_by_table_size(self):
+        params = Params(prefix='$NEO', key='abc')
+        one = params.bind_param('one')
+        named = params.bind_param('two', 'named')
+        three = params.bind_param('three')
+        again = params.bind_param('one')
+
+        self.assertEqual('NEO_abc_0', one.name)
+        self.assertEqual('named', named.name)
+        self.assertEqual('NEO_abc_2', three.name)
+        self.assertEqual(one.name, again.name)
+        self.assertEqual(['NEO_abc_0', 'NEO_abc_2', 'named'],
+            list(params.bound_params))
+
+    def test_can_reuse_param_for_unhashable_values(self):
+        p = Pypher()
+        one = p.bind_param([1, 2, 3])
+        two = p.bind_param({'a': [1]})
+        three = p.bind_param([1, 2, 3])
+        four = p.bind_param({'a': [1]})
+        five = p.bind_param((1, 2, 3))
+
+        params = p.bound_params
+
+        self.assertEqual(one.name, three.name)
+        self.assertEqual(two.name, four.name)
+        self.assertNotEqual(one.name, five.name)
+        self.assertEqual(3, len(params))
+
+    def test_will_not_reuse_param_of_equal_value_with_different_type(self):
+        p = Pypher()
+        one = p.bind_param(1)
+        true = p.bind_param(True)
+        float_one = p.bind_param(1.0)
+
+        self.assertEqual(3, len({one.name, true.name, float_one.name}))
+
+    def test_rebinding_a_name_updates_reused_params(self):
+        params = Params(prefix='$NEO', key='abc')
+        first = params.bind_param('one', 'first')
+        second = params.bind_param('two', 'second')
+        params.bind_param('three', 'first')
+        one = params.bind_param('one')
+        three = params.bind_param('three')
+
+        self.assertEqual('first', first.name)
+        self.assertEqual('NEO_abc_2', one.name)
+        self.assertEqual('first', three.name)
+        self.assertEqual('two', params.bound_params['second'])
+
+    def test_can_reuse_params_of_cloned_params(self):
+        params = Params(prefix='$NEO', key='abc')
+        one = params.bind_param('one')
+        clone = params.clone()
+        two = clone.bind_param('one')
+
+        self.assertEqual(one.name, two.name)
+
+    def test_bind_many_matches_bind_param(self):
+        nested = __.n.__name__
+        items = [('a', 1), ('b', 'one'), ('c', 1), ('d', True), ('e', None),
+            ('f', [1, 2]), ('g', [1, 2]), ('h', Param('named', 'x')),
+            ('i', 1.0), ('j', 'named'), ('k', nested), ('l', 'one')]
+        single = Params(prefix='$NEO', key='abc')
+        single.pypher = Pypher()
+        placeholders = [single.bind_param(value, single.param_name(name))
+            .placeholder for name, value in items]
+        many = Params(prefix='$NEO', key='abc')
+        many_placeholders = many.bind_many(items, Pypher())
+
+        self.assertEqual(placeholders, many_placeholders)
+        self.assertEqual(single.bound_params, many.bound_params)
+        self.assertEqual(single._value_index, many._value_index)
+        self.assertEqual(single._unhashable, many._unhashable)
+
+    def test_bind_many_changes_version_once(self):
+        params = Params(key='abc')
+        version = params._version
+        params.bind_many([('a', 1), ('b', 2), ('c', 3)])
+
+        self.assertEqual(version + 1, params._version)
+        self.assertEqual([1, 2, 3], list(params.bound_params.values()))
+
+    def test_bind_many_uses_the_prefix_without_a_name(self):
+        params = Params(prefix='$NEO', key='abc')
+        placeholders = params.bind_many([(None, 1)])
+
+        self.assertEqual(['$NEO_abc_0'], placeholders)
+        self.assertEqual({'NEO_abc_0': 1}, dict(params.bound_params))
+
+    def test_can_merge_params_into_empty_params(self):
+        params = Params(prefix='$NEO', key='abc')
+        other = Params(prefix='$NEO', key='xyz')
+        one = other.bind_param('one')
+        two = other.bind_param([1, 2])
+        params.merge(other)
+
+        self.assertEqual(other.bound_params, params.bound_params)
+        self.assertEqual(one.name, params.bind_param('one').name)
+        self.assertEqual(two.name, params.bind_param([1, 2]).name)
+
+    def test_merge_reuses_names_of_bound_values(self):
+        params = Params(prefix='$NEO', key='abc')
+        other = Params(prefix='$NEO', key='xyz')
+        one = params.bind_param('one')
+        other.bind_param('one')
+        other.bind_param('two', 'second')
+        params.merge(other)
+
+        self.assertEqual(2, len(params.bound_params))
+        self.assertEqual('one', params.bound_params[one.name])
+        self.assertEqual('two', params.bound_params['second'])
+
+    def test_merging_the_same_params_again_does_nothing(self):
+        params = Params(prefix='$NEO', key='abc')
+        other = Params(prefix='$NEO', key='xyz')
+        other.bind_param('one')
+        params.bind_param('zero')
+        params += other
+        version = params._version
+        params += other
+
+        self.assertEqual(version, params._version)
+        self.assertEqual(2, len(params.bound_params))
+
+        other.bind_param('two')
+        params += other
+
+        self.assertEqual(3, len(params.bound_params))
+        self.assertIn('two', params.bound_params.values())
+
+    def test_merge_renames_clashing_deterministic_names(self):
+        sub = Pypher(deterministic=True)
+        sub.n.__a__ == 'v'
+        str(sub)
+        p = Pypher(deterministic=True)
+        p.n.__b__ == 'w'
+        str(p)
+        p.WHERE(sub)
+        c = str(p)
+
+        self.assertEqual(c, 'n.`b` = $NEO_p_0 WHERE n.`a` = $NEO_p_1')
+        self.assertEqual({'NEO_p_0': 'w', 'NEO_p_1': 'v'},
+            dict(p.bound_params))
+
+    def test_params_key_is_created_when_first_needed(self):
+        params = Params(prefix='$NEO')
+
+        self.assertIsNone(params._key)
+
+        one = params.bind_param('one')
+
+        self.assertIsNotNone(params._key)
+        self.assertEqual('NEO_{}_0'.format(params.key), one.name)
+
+    def test_pypher_creates_params_when_first_needed(self):
+        p = Pypher()
+        p.MATCH.node('n').RETURN.n
+
+        self.assertIsNone(p._params)
+
+        params = p.params
+
+        self.assertIs(params, p._params)
+
+    def test_nested_pypher_without_params_does_not_create_params(self):
+        p = Pypher()
+        nested = __.n.__name__
+        p.RETURN(nested)
+        str(p)
+
+        self.assertIsNone(nested._params)
+        self.assertIs(p.params, nested.params)
+        self.assertEqual(0, len(p.bound_params))
+
+    def test_nested_pypher_params_are_merged_once_added(self):
+        p = Pypher()
+        nested = __.n.__name__ == 'mark'
+        str(nested)
+        p.RETURN(nested)
+        str(p)
+        params = p.bound_params
+
+        self.assertIsNone(nested._params)
+        self.assertEqual(1, len(params))
+        self.assertIn('mark', params.values())
+
+    def test_deterministic_pypher_creates_the_same_param_names(self):
+        def build():
+            p = Pypher(deterministic=True)
+            p.MATCH.node('n', 'User', name='mark').WHERE.n.__age__ > 21
+            p.RETURN(__.n).LIMIT(__.toInteger(10))
+
+            return p
+
+        one = build()
+        two = build()
+
+        self.assertEqual(str(one), str(two))
+        self.assertEqual(one.bound_params, two.bound_params)
+        self.assertEqual(3, len(one.bound_params))
+
+    def test_can_make_every_pypher_deterministic(self):
+        import pypher
+
+        pypher.builder.DETERMINISTIC_PARAMS = True
+
+        try:
+            one = Pypher()
+            two = Pypher()
+            one.n.__age__ > 21
+            two.n.__age__ > 21
+
+            self.assertEqual(str(one), str(two))
+        finally:
+            pypher.builder.DETERMINISTIC_PARAMS = False
+
+    def test_deterministic_pypher_keeps_its_setting_after_reset(self):
+        p = Pypher(deterministic=True)
+        p.reset()
+
+        self.assertTrue(p.params.deterministic)
+        self.assertEqual(Params.DETERMINISTIC_KEY, p.params.key)
+
+    def test_deterministic_params_will_not_overwrite_each_other(self):
+        p = Pypher(deterministic=True)
+        p2 = Pypher(deterministic=True)
+        one = p.bind_param('one')
+        two = p2.bind_param('two')
+        p.func('testing', p2)
+
+        str(p)
+        params = p.bound_params
+
+        self.assertEqual(one.name, two.name)
+        self.assertEqual(2, len(params))
+        self.assertIn('one', params.values())
+        self.assertIn('two', params.values())
+
     def test_can_add_param_to_statement(self):
         p = Pypher()
         n = 'some_param'
@@ -1766,5 +2423,866 @@ class ParamTests(unittest.TestCase):
 
         self.assertEqual(str(p), f'IN split(${list(p.bound_params)[0]}, ${list(p.bound_params)[1]})')
 
+class FingerprintTests(unittest.TestCase):
+
+    def build(self, user_id, name):
+        p = Pypher()
+        p.MATCH.node('u', 'User', id=user_id)
+        p.WHERE(__.u.__name__ == name).RETURN.u.LIMIT(10)
+
+        return p
+
+    def test_same_structure_has_the_same_fingerprint(self):
+        one = self.build(1, 'mark')
+        two = self.build(2, 'someone else')
+
+        self.assertNotEqual(str(one), str(two))
+        self.assertEqual(one.fingerprint, two.fingerprint)
+
+    def test_deterministic_params_have_the_same_fingerprint(self):
+        one = self.build(1, 'mark')
+        two = Pypher(deterministic=True)
+        two.MATCH.node('u', 'User', id=1)
+        two.WHERE(__.u.__name__ == 'mark').RETURN.u.LIMIT(10)
+
+        self.assertEqual(one.fingerprint, two.fingerprint)
+
+    def test_different_structure_has_a_different_fingerprint(self):
+        fingerprint = self.build(1, 'mark').fingerprint
+        queries = [Pypher() for _ in range(5)]
+        queries[0].MATCH.node('u', 'Admin', id=1)
+        queries[1].MATCH.node('u', 'User', key=1)
+        queries[2].MATCH.node('u', 'User', id=1).RETURN.u
+        queries[3].MATCH.node('u', 'User', id=Param('user_id'))
+        queries[4].MATCH.node('u', 'User').rel_out(labels='KNOWS').node('m')
+        fingerprints = set(q.fingerprint for q in queries)
+
+        self.assertEqual(5, len(fingerprints))
+        self.assertNotIn(fingerprint, fingerprints)
+
+    def test_statement_args_are_part_of_the_fingerprint(self):
+        one = Pypher()
+        one.MATCH('(n:User)').RETURN('n.name').LIMIT(10)
+        two = Pypher()
+        two.MATCH('(n:User)').RETURN('count(n)').LIMIT(99)
+        three = Pypher()
+        three.MATCH('(n:User)').RETURN('n.name').LIMIT(Param('limit', 10))
+        four = Pypher()
+        four.MATCH('(n:User)').RETURN('n.name').LIMIT(Param('limit', 99))
+
+        self.assertNotEqual(one.fingerprint, two.fingerprint)
+        self.assertNotEqual(one.fingerprint, three.fingerprint)
+        self.assertEqual(three.fingerprint, four.fingerprint)
+
+    def test_fingerprint_is_updated_as_links_are_added(self):
+        p = Pypher()
+        fingerprints = set()
+
+        for statement in ['MATCH', 'WHERE', 'RETURN', 'LIMIT']:
+            getattr(p, statement)(__.n)
+            fingerprints.add(p.fingerprint)
+
+        fresh = Pypher()
+        fresh.MATCH(__.n).WHERE(__.n).RETURN(__.n).LIMIT(__.n)
+
+        self.assertEqual(4, len(fingerprints))
+        self.assertEqual(fresh.fingerprint, p.fingerprint)
+
+    def test_fingerprint_is_updated_when_links_are_removed(self):
+        p = Pypher()
+        p.MATCH.node('n').RETURN.n
+        before = p.fingerprint
+        p.LIMIT(1)
+        p.fingerprint
+        p.remove_link(p._bottom)
+
+        self.assertEqual(before, p.fingerprint)
+
+        p.remove_link(p.next)
+        fresh = Pypher()
+        fresh.node('n').RETURN.n
+
+        self.assertEqual(fresh.fingerprint, p.fingerprint)
+
+    def test_fingerprint_is_updated_when_links_are_added_before_self(self):
+        p = Pypher()
+        p.node('n').RETURN.n
+        p.fingerprint
+        p.add_link(Statement(name='foo'), before_self=True)
+        fresh = Pypher()
+        fresh.foo.node('n').RETURN.n
+
+        self.assertEqual(fresh.fingerprint, p.fingerprint)
+
+    def test_fingerprint_does_not_change_when_rendered(self):
+        p = Pypher()
+        p.RETURN(__.bAnd(1, 2, 3)).SET.n += {'a': [1, 2]}
+        fingerprint = p.fingerprint
+        str(p)
+        str(p)
+
+        self.assertEqual(fingerprint, p.clone().fingerprint)
+        self.assertEqual(fingerprint, p.fingerprint)
+
+    def test_fingerprint_includes_partial_changes(self):
+        from pypher.partial import Case
+
+        case = Case(__.n.__eyes__)
+        case.WHEN('"blue"', 1)
+        p = Pypher()
+        p.RETURN(case).AS('eyes')
+        fingerprint = p.fingerprint
+        case.ELSE(-1)
+
+        self.assertNotEqual(fingerprint, p.fingerprint)
+
+
+class ThreadingTests(unittest.TestCase):
+
+    def setUp(self):
+        # switch threads as often as possible to make races likely
+        self.interval = sys.getswitchinterval()
+        sys.setswitchinterval(1e-6)
+
+    def tearDown(self):
+        sys.setswitchinterval(self.interval)
+
+    def run_threads(self, target, count=8):
+        errors = []
+
+        def run(i):
+            try:
+                target(i)
+            except Exception as e:
+                errors.append(e)
+
+        threads = [threading.Thread(target=run, args=(i,))
+            for i in range(count)]
+
+        for thread in threads:
+            thread.start()
+
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual([], errors)
+
+    def test_can_render_shared_nested_pypher_from_many_threads(self):
+        shared = __.n.__name__ == 'shared'
+
+        def build(worker):
+            for i in range(50):
+                p = Pypher()
+                p.MATCH.node('n', id='{}-{}'.format(worker, i)).WHERE(shared)
+                cypher, params = p.compile()
+                names = re.findall(r'\$(\w+)', cypher)
+
+                self.assertEqual(2, len(params))
+                self.assertEqual(set(params), set(names))
+                self.assertIn('shared', params.values())
+                self.assertIn('{}-{}'.format(worker, i), params.values())
+
+        self.run_threads(build)
+
+    def test_can_render_the_same_pypher_from_many_threads(self):
+        p = Pypher()
+        p.MATCH.node('n', 'User', id=1).WHERE(__.n.__name__ == 'name')
+        results = []
+
+        def render(worker):
+            for i in range(50):
+                results.append(str(p))
+
+        self.run_threads(render)
+
+        self.assertEqual(1, len(set(results)))
+        self.assertEqual(2, len(p.bound_params))
+
+    def test_unrelated_queries_are_rendered_in_parallel(self):
+        entered = threading.Event()
+        release = threading.Event()
+
+        class BlockingFunc(Func):
+            name = 'blocking'
+
+            def __unicode__(self):
+                entered.set()
+                release.wait(5)
+
+                return super(BlockingFunc, self).__unicode__()
+
+        blocked = Pypher()
+        blocked.RETURN.BlockingFunc(1)
+        blocked_thread = threading.Thread(target=str, args=(blocked,))
+        results = []
+
+        def render():
+            p = Pypher()
+            p.MATCH.node('n').RETURN.n
+            results.append(str(p))
+
+        blocked_thread.start()
+
+        try:
+            self.assertTrue(entered.wait(5))
+
+            other = threading.Thread(target=render)
+            other.start()
+            other.join(2)
+
+            self.assertEqual(['MATCH (n) RETURN n'], results)
+        finally:
+            release.set()
+            blocked_thread.join()
+
+    def test_can_register_links_while_building_in_other_threads(self):
+        from pypher.builder import create_function
+
+        def build(worker):
+            if worker == 0:
+                for i in range(50):
+                    create_function('threaded_func_{}'.format(i))
+
+                return
+
+            for i in range(50):
+                p = Pypher()
+                p.RETURN.count(__.n).AS('total')
+
+                self.assertEqual('RETURN count(n) AS total', str(p))
+
+        self.run_threads(build)
+
+
+class ParamsViewTests(unittest.TestCase):
+
+    def test_view_is_read_only_and_live(self):
+        p = Pypher()
+        p.WHERE(__.n.__name__ == 'name')
+        str(p)
+        view = p.params_view
+
+        self.assertEqual(dict(p.bound_params), dict(view))
+
+        with self.assertRaises(TypeError):
+            view['other'] = 1
+
+        p.params.bind_param('other', 'other')
+
+        self.assertEqual('other', view['other'])
+
+    def test_view_keeps_bind_order(self):
+        params = Params()
+        names = ['z', 'a', 'm']
+
+        for i, name in enumerate(names):
+            params.bind_param(i, name)
+
+        self.assertEqual(names, list(params.view))
+        self.assertEqual(sorted(names), list(params.bound_params))
+
+
+class MapParamTests(unittest.TestCase):
+
+    def test_node_can_bind_properties_as_one_param(self):
+        p = Pypher()
+        p.MERGE.node('n', 'User', map_param='props', name='mark', age=99)
+        c = str(p)
+        exp = ('MERGE (n:`User` {`age`: $props.`age`,'
+            ' `name`: $props.`name`})')
+
+        self.assertEqual(c, exp)
+        self.assertEqual({'props': {'age': 99, 'name': 'mark'}},
+            dict(p.bound_params))
+
+    def test_node_map_param_can_create_param_name(self):
+        p = Pypher()
+        p.MERGE.node('n', map_param=True, name='mark')
+        c = str(p)
+        params = p.bound_params
+        name = get_dict_key(params, {'name': 'mark'})
+
+        self.assertTrue(name.startswith('props'))
+        self.assertEqual(c, 'MERGE (n {{`name`: ${}.`name`}})'.format(name))
+        self.assertEqual(1, len(params))
+
+    def test_node_map_param_keeps_inline_pypher_values(self):
+        p = Pypher()
+        p.MERGE.node('n', map_param='props', id=__.row.__id__, name='mark')
+        c = str(p)
+        exp = 'MERGE (n {`id`: row.`id`, `name`: $props.`name`})'
+
+        self.assertEqual(c, exp)
+        self.assertEqual({'name': 'mark'}, p.bound_params['props'])
+
+    def test_relationship_can_bind_properties_as_one_param(self):
+        p = Pypher()
+        p.MATCH.node('a').rel_out('r', 'KNOWS', map_param='rel',
+            since=2000).node('b')
+        c = str(p)
+        exp = 'MATCH (a)-[r:`KNOWS` {`since`: $rel.`since`}]->(b)'
+
+        self.assertEqual(c, exp)
+        self.assertEqual({'rel': {'since': 2000}}, dict(p.bound_params))
+
+    def test_map_can_be_rendered_as_one_param(self):
+        p = Pypher()
+        p.SET.n += __.map(map_param='props', name='mark', tags=['a', 'b'])
+        c = str(p)
+
+        self.assertEqual(c, 'SET n += $props')
+        self.assertEqual({'props': {'name': 'mark', 'tags': ['a', 'b']}},
+            dict(p.bound_params))
+
+    def test_map_with_args_uses_keyed_form(self):
+        p = Pypher()
+        p.RETURN.map('one', two=2, map_param='props')
+        c = str(p)
+
+        self.assertEqual(c, 'RETURN {one, `two`: $props.`two`}')
+        self.assertEqual({'props': {'two': 2}}, dict(p.bound_params))
+
+    def test_map_projection_uses_keyed_form(self):
+        p = Pypher()
+        p.RETURN.map_projection('n', '.name', age=3, map_param='props')
+        c = str(p)
+
+        self.assertEqual(c, 'RETURN n {.name, `age`: $props.`age`}')
+
+    def test_map_param_shape_does_not_depend_on_values(self):
+        def build(name):
+            p = Pypher()
+            p.MERGE.node('n', map_param='props', name=name)
+
+            return p
+
+        self.assertEqual(build('one').fingerprint, build('two').fingerprint)
+
+
+class BudgetTests(unittest.TestCase):
+
+    def setUp(self):
+        self.budget = dict(BUDGET)
+
+    def tearDown(self):
+        BUDGET.clear()
+        BUDGET.update(self.budget)
+
+    def test_large_in_list_is_bound_as_one_param(self):
+        BUDGET['in_list_param'] = 3
+        p = Pypher()
+        p.n.__id__.IN(1, 2, 3, 4)
+        c = str(p)
+        params = p.bound_params
+        name = get_dict_key(params, [1, 2, 3, 4])
+
+        self.assertEqual(c, 'n.`id` IN ${}'.format(name))
+        self.assertEqual(1, len(params))
+
+    def test_small_in_list_binds_each_value(self):
+        BUDGET['in_list_param'] = 3
+        p = Pypher()
+        p.n.__id__.IN(1, 2, 3)
+        c = str(p)
+
+        self.assertEqual(3, len(p.bound_params))
+        self.assertTrue(c.startswith('n.`id` IN [$'))
+
+    def test_in_list_with_pypher_values_is_not_rewritten(self):
+        BUDGET['in_list_param'] = 1
+        p = Pypher()
+        p.n.__id__.IN(__.a.__id__, __.b.__id__)
+        c = str(p)
+
+        self.assertEqual(c, 'n.`id` IN [a.`id`, b.`id`]')
+
+    def test_in_list_rewrite_can_be_turned_off(self):
+        BUDGET['in_list_param'] = None
+        p = Pypher()
+        p.n.__id__.IN(*range(200))
+        str(p)
+
+        self.assertEqual(200, len(p.bound_params))
+
+    def test_will_raise_error_when_params_exceed_budget(self):
+        BUDGET['max_params'] = 2
+        p = Pypher()
+        p.MATCH.node('n', one=1, two=2, three=3)
+
+        self.assertRaises(PypherBudgetException, str, p)
+
+    def test_will_raise_error_when_links_exceed_budget(self):
+        BUDGET['max_links'] = 3
+        p = Pypher()
+        p.MATCH.node('n').RETURN.n
+
+        self.assertRaises(PypherBudgetException, p.compile)
+
+    def test_links_of_nested_pypher_count_towards_budget(self):
+        sub = Pypher()
+
+        for i in range(51):
+            sub.link('n{}'.format(i))
+
+        p = Pypher()
+        p.MATCH.node('n').WHERE(sub).RETURN.n
+        BUDGET['max_links'] = 5
+
+        self.assertRaises(PypherBudgetException, str, p)
+
+        BUDGET['max_links'] = 56
+        str(p)
+
+    def test_links_of_cached_nested_pypher_count_towards_budget(self):
+        inner = __.n.__name__
+        sub = __.collect(inner)
+        str(sub)
+        p = Pypher()
+        p.RETURN(sub)
+        BUDGET['max_links'] = 3
+
+        self.assertRaises(PypherBudgetException, str, p)
+
+        BUDGET['max_links'] = 4
+
+        self.assertEqual('RETURN collect(n.`name`)', str(p))
+
+    def test_changing_in_list_threshold_rebuilds_cypher(self):
+        BUDGET['in_list_param'] = 1
+        p = Pypher()
+        p.n.__id__.IN(1, 2)
+        first = str(p)
+        BUDGET['in_list_param'] = None
+        second = str(p)
+
+        self.assertTrue(first.startswith('n.`id` IN $'))
+        self.assertTrue(second.startswith('n.`id` IN [$'))
+
+    def test_will_raise_error_when_text_exceeds_budget(self):
+        BUDGET['max_length'] = 10
+        p = Pypher()
+        p.MATCH.node('a_long_variable_name')
+
+        self.assertRaises(PypherBudgetException, str, p)
+
+    def test_query_within_budget_is_rendered(self):
+        BUDGET.update(max_length=100, max_links=10, max_params=10)
+        p = Pypher()
+        p.MATCH.node('n', name='mark').RETURN.n
+
+        self.assertTrue(str(p).startswith('MATCH (n {`name`: $'))
+
+    def test_can_warn_once_instead_of_raising(self):
+        BUDGET.update(max_links=1, on_exceeded='warn')
+        p = Pypher()
+        p.MATCH.node('n').RETURN.n.WHERE.n
+
+        with warnings.catch_warnings(record=True) as caught:
+            warnings.simplefilter('always')
+            c = str(p)
+
+        self.assertEqual(c, 'MATCH (n) RETURN n WHERE n')
+        self.assertEqual(1, len(caught))
+        self.assertIs(PypherBudgetWarning, caught[0].category)
+
+
+class CompiledTests(unittest.TestCase):
+
+    def test_can_compile_pypher(self):
+        p = Pypher()
+        p.MATCH.node('u', 'User', id=1).RETURN.u
+        compiled = p.compile()
+        cypher, params = compiled
+        name = get_dict_key(params, 1)
+        exp = 'MATCH (u:`User` {{`id`: ${}}}) RETURN u'.format(name)
+
+        self.assertIsInstance(compiled, Compiled)
+        self.assertEqual(exp, cypher)
+        self.assertEqual(exp, str(compiled))
+        self.assertEqual(dict(p.bound_params), dict(params))
+
+    def test_compiled_params_are_read_only(self):
+        p = Pypher()
+        p.RETURN(__.n.__id__ == 1)
+        compiled = p.compile()
+
+        with self.assertRaises(TypeError):
+            compiled.params['other'] = 2
+
+        with self.assertRaises(AttributeError):
+            compiled.cypher = 'RETURN 1'
+
+    def test_will_reuse_compiled_for_unchanged_pypher(self):
+        p = Pypher()
+        p.MATCH.node('n', id=1)
+
+        self.assertIs(p.compile(), p.compile())
+
+        str(p)
+
+        self.assertIs(p.compile(), p.compile())
+
+    def test_changing_pypher_does_not_change_compiled(self):
+        p = Pypher()
+        p.MATCH.node('n', id=1)
+        compiled = p.compile()
+        p.WHERE.n.__name__ == 'name'
+        compiled2 = p.compile()
+
+        self.assertIsNot(compiled, compiled2)
+        self.assertEqual(1, len(compiled.params))
+        self.assertEqual(2, len(compiled2.params))
+        self.assertNotIn('WHERE', compiled.cypher)
+        self.assertIn('WHERE', compiled2.cypher)
+
+    def test_can_dump_and_load_compiled(self):
+        p = Pypher()
+        p.MATCH.node('u', 'User', id=1, tags=['a', 'b'], meta={'x': 1.5})
+        p.SET.u.__name__ == Param('name')
+        p.RETURN.u
+        compiled = p.compile()
+        data = compiled.dumps()
+        loaded = Compiled.loads(data)
+
+        self.assertIsInstance(data, bytes)
+        self.assertIsInstance(loaded, Compiled)
+        self.assertEqual(compiled.cypher, loaded.cypher)
+        self.assertEqual(dict(compiled.params), dict(loaded.params))
+        self.assertIs(UNBOUND, loaded.params['name'])
+
+        with self.assertRaises(TypeError):
+            loaded.params['other'] = 2
+
+    def test_can_pickle_compiled(self):
+        p = Pypher()
+        p.MATCH.node('u', 'User', id=1).RETURN.u
+        compiled = p.compile()
+        loaded = pickle.loads(pickle.dumps(compiled))
+
+        self.assertEqual(compiled.cypher, loaded.cypher)
+        self.assertEqual(dict(compiled.params), dict(loaded.params))
+
+    def test_can_pickle_and_copy_compiled_with_any_params(self):
+        p = Pypher()
+        p.MATCH.node('u', 'User', created=date(2020, 1, 1),
+            score=Decimal('1.5'), name=Name('mark')).RETURN.u
+        compiled = p.compile()
+        exp = dict(compiled.params)
+
+        for loaded in (pickle.loads(pickle.dumps(compiled)),
+                       copy.deepcopy(compiled)):
+            self.assertIsInstance(loaded, Compiled)
+            self.assertEqual(compiled.cypher, loaded.cypher)
+            self.assertEqual(exp, dict(loaded.params))
+
+            with self.assertRaises(TypeError):
+                loaded.params['other'] = 2
+
+        self.assertRaises(PypherArgumentException, compiled.dumps)
+
+    def test_dumps_is_smaller_than_pickle(self):
+        p = Pypher()
+
+        for i in range(20):
+            p.MATCH.node('n{}'.format(i), 'User', id=i, name='name')
+
+        compiled = p.compile()
+        pickled = pickle.dumps((compiled.cypher, dict(compiled.params)),
+            protocol=2)
+
+        self.assertLess(len(compiled.dumps()), len(pickled))
+
+    def test_cannot_dump_unsupported_params(self):
+        p = Pypher()
+        p.RETURN(__.n.__id__ == object())
+
+        with self.assertRaises(PypherArgumentException):
+            p.compile().dumps()
+
+    def test_cannot_load_invalid_data(self):
+        with self.assertRaises(PypherArgumentException):
+            Compiled.loads(b'not a query')
+
+
+class CloneTests(unittest.TestCase):
+
+    def prefix(self):
+        p = Pypher()
+        p.MATCH.node('u', 'User', id=1).rel_out(labels='KNOWS').node('f')
+        p.WHERE(__.f.__age__ > 21)
+
+        return p
+
+    def test_clone_shares_links(self):
+        p = self.prefix()
+        links = list(p.iter_links())
+        c = p.clone()
+
+        self.assertIsNone(c.next)
+        self.assertEqual(len(links), len(list(c.iter_links())))
+
+        for link, shared in zip(links, c.iter_links()):
+            self.assertIs(link, shared)
+
+        for link, shared in zip(links, p.iter_links()):
+            self.assertIs(link, shared)
+
+    def test_clones_can_branch(self):
+        p = self.prefix()
+        exp = str(p)
+        branches = [p.clone() for _ in range(5)]
+
+        for i, branch in enumerate(branches):
+            branch.RETURN.f.LIMIT(i)
+
+        p.RETURN.u
+
+        for i, branch in enumerate(branches):
+            self.assertEqual('{} RETURN f LIMIT {}'.format(exp, i),
+                str(branch))
+
+        self.assertEqual(exp + ' RETURN u', str(p))
+
+    def test_can_clone_clone(self):
+        p = Pypher()
+        p.a.b
+        c = p.clone()
+        c.c.d
+        d = c.clone()
+        d.x
+        c.y
+        p.z
+
+        self.assertEqual('a b c d x', str(d))
+        self.assertEqual('a b c d y', str(c))
+        self.assertEqual('a b z', str(p))
+
+    def test_can_call_shared_link(self):
+        p = Pypher()
+        p.MATCH.node('n').count
+        c = p.clone()
+        c(__.n)
+        exp = Pypher()
+        exp.MATCH.node('n').count(__.n)
+
+        self.assertEqual(str(exp), str(c))
+        self.assertEqual('MATCH (n) count()', str(p))
+
+    def test_can_remove_shared_link(self):
+        p = Pypher()
+        p.a.b.c
+        c = p.clone()
+        links = list(c.iter_links())
+        c.remove_link(links[1])
+        c.d
+
+        self.assertEqual('a c d', str(c))
+        self.assertEqual('a b c', str(p))
+        self.assertEqual(links, list(p.iter_links()))
+
+    def test_can_add_link_before_shared_links(self):
+        p = Pypher(deterministic=True)
+        p.n.__age__
+        c = p.clone()
+        c = 10 - c
+        exp = Pypher(deterministic=True)
+        exp.n.__age__
+        exp = 10 - exp
+
+        self.assertEqual(str(exp), str(c))
+        self.assertEqual('n.`age`', str(p))
+
+    def test_can_append_clone(self):
+        p = Pypher()
+        p.a.b
+        c = p.clone()
+        c.c
+        q = Pypher()
+        q.x.append(c)
+
+        self.assertEqual('x a b c', str(q))
+        self.assertEqual('a b c', str(c))
+        self.assertEqual('a b', str(p))
+
+    def test_clones_have_their_own_params(self):
+        p = Pypher()
+        p.MATCH.node('n', id=1)
+        str(p)
+        c = p.clone()
+        c.WHERE.n.__name__ == 'name'
+        cypher = str(c)
+        str(p)
+
+        self.assertIsNot(p.params, c.params)
+        self.assertEqual([1], list(p.bound_params.values()))
+        self.assertEqual(set([1, 'name']), set(c.bound_params.values()))
+
+        for name in c.bound_params:
+            self.assertIn('$' + name, cypher)
+
+    def test_clones_share_fingerprint_of_prefix(self):
+        p = self.prefix()
+        fingerprint = p.fingerprint
+        c = p.clone()
+
+        self.assertEqual(fingerprint, c.fingerprint)
+        self.assertEqual(fingerprint, p.fingerprint)
+
+        c.RETURN.f
+        p.RETURN.f
+
+        self.assertEqual(p.fingerprint, c.fingerprint)
+        self.assertNotEqual(fingerprint, c.fingerprint)
+
+        c.LIMIT(1)
+
+        self.assertNotEqual(p.fingerprint, c.fingerprint)
+
+    def test_can_pickle_branches_together(self):
+        p = self.prefix()
+        c = p.clone()
+        p.RETURN.u
+        c.RETURN.f
+        exp = [str(p), str(c)]
+        loaded = pickle.loads(pickle.dumps([p, c]))
+
+        self.assertEqual(exp, [str(q) for q in loaded])
+
+
+class PickleTests(unittest.TestCase):
+
+    def test_can_pickle_pypher(self):
+        p = Pypher()
+        p.MATCH.node('u', 'User', id=1).rel_out(labels='KNOWS').node('f')
+        p.WHERE(__.f.__name__ == 'name').RETURN.f
+        exp = str(p)
+        loaded = pickle.loads(pickle.dumps(p))
+
+        self.assertEqual(exp, str(loaded))
+        self.assertEqual(dict(p.bound_params), dict(loaded.bound_params))
+        self.assertEqual(p.fingerprint, loaded.fingerprint)
+
+    def test_can_add_links_after_pickling(self):
+        p = Pypher()
+        p.MATCH.node('u')
+        loaded = pickle.loads(pickle.dumps(p))
+        loaded.RETURN.u
+
+        self.assertEqual('MATCH (u) RETURN u', str(loaded))
+        self.assertEqual('MATCH (u)', str(p))
+
+    def test_can_pickle_long_chain(self):
+        p = Pypher()
+
+        for i in range(sys.getrecursionlimit() * 2):
+            p.MATCH.node('n{}'.format(i))
+
+        loaded = pickle.loads(pickle.dumps(p))
+
+        self.assertEqual(str(p), str(loaded))
+
+
+class TemplateTests(unittest.TestCase):
+
+    def test_can_create_template_from_pypher(self):
+        p = Pypher()
+        p.MATCH.node('u', 'User', id=Param('user_id'))
+        p.SET.u.__name__ == Param('name')
+        template = p.template()
+
+        exp = 'MATCH (u:`User` {`id`: $user_id}) SET u.`name` = $name'
+
+        self.assertIsInstance(template, Template)
+        self.assertEqual(exp, template.cypher)
+        self.assertEqual(exp, str(template))
+        self.assertEqual({'user_id', 'name'}, template.required)
+
+    def test_can_bind_values_to_template(self):
+        p = Pypher()
+        p.MATCH.node('u', 'User', id=Param('user_id'))
+        p.SET.u.__name__ == Param('name')
+        template = p.template()
+
+        one = template.bind(user_id=1, name='one')
+        two = template.bind(user_id=2, name='two')
+
+        self.assertEqual({'user_id': 1, 'name': 'one'}, one)
+        self.assertEqual({'user_id': 2, 'name': 'two'}, two)
+
+    def test_template_will_use_bound_values_as_defaults(self):
+        p = Pypher()
+        p.MATCH.node('u', 'User', id=Param('user_id'))
+        p.RETURN.u.LIMIT(Param('limit', 10))
+        template = p.template()
+
+        self.assertEqual({'user_id': 1, 'limit': 10},
+            template.bind(user_id=1))
+        self.assertEqual({'user_id': 1, 'limit': 5},
+            template.bind(user_id=1, limit=5))
+
+    def test_template_will_keep_automatically_named_params(self):
+        p = Pypher()
+        p.MATCH.node('u', 'User', id=Param('user_id')).WHERE.u.__age__ > 21
+        template = p.template()
+        params = p.bound_params
+        age = get_dict_key(params, 21)
+
+        self.assertEqual({'user_id': 1, age: 21}, template.bind(user_id=1))
+
+    def test_unbound_params_are_not_reused(self):
+        p = Pypher()
+        one = p.bind_param(Param('one'))
+        two = p.bind_param(Param('two'))
+
+        self.assertEqual('one', one.name)
+        self.assertEqual('two', two.name)
+        self.assertIs(UNBOUND, p.bound_params['one'])
+
+    def test_named_params_are_not_shared_with_equal_values(self):
+        p = Pypher()
+        p.MATCH.node('u', 'User', id=Param('user_id'))
+        p.WHERE(__.u.__age__ > Param('age', 10)).AND(__.u.__score__ == 10)
+        template = p.template()
+        params = p.bound_params
+        score, = set(params) - {'user_id', 'age'}
+
+        exp = ('MATCH (u:`User` {{`id`: $user_id}}) WHERE u.`age` > $age'
+            ' AND u.`score` = ${}').format(score)
+
+        self.assertEqual(exp, template.cypher)
+        self.assertEqual({'user_id': 1, 'age': 30, score: 10},
+            template.bind(user_id=1, age=30))
+
+    def test_named_params_are_not_renamed_to_equal_values(self):
+        p = Pypher()
+        p.MATCH.node('u', 'User', age=10).RETURN.u.LIMIT(Param('limit', 10))
+        template = p.template()
+        params = p.bound_params
+        age, = set(params) - {'limit'}
+
+        exp = ('MATCH (u:`User` {{`age`: ${}}}) RETURN u'
+            ' LIMIT $limit').format(age)
+
+        self.assertEqual(exp, template.cypher)
+        self.assertEqual({age: 10, 'limit': 5}, template.bind(limit=5))
+
+    def test_template_will_raise_error_for_unknown_params(self):
+        p = Pypher()
+        p.RETURN(Param('one'))
+        template = p.template()
+
+        def bind():
+            template.bind(one=1, two=2)
+
+        self.assertRaises(PypherArgumentException, bind)
+
+    def test_template_will_raise_error_for_missing_params(self):
+        p = Pypher()
+        p.RETURN(Param('one'))
+        template = p.template()
+
+        self.assertRaises(PypherArgumentException, template.bind)
+
+
 if __name__ == '__main__':
     unittest.main()
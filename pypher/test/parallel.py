@@ -0,0 +1,123 @@
+import functools
+import unittest
+
+from datetime import date
+
+from concurrent.futures import ThreadPoolExecutor
+
+from pypher.builder import Pypher, Compiled, __
+from pypher.exception import PypherArgumentException
+from pypher.parallel import compile_many, compile_item
+from pypher.partial import Case
+
+
+def build_user(user_id, pypher):
+    pypher.MATCH.node('u', 'User', id=user_id).RETURN.u
+
+
+def return_user(user_id, pypher):
+    other = Pypher()
+    other.MATCH.node('u', 'User', name=user_id).RETURN.u
+
+    return other
+
+
+def build_signup(day, pypher):
+    pypher.MATCH.node('u', 'User', created=date(2020, 1, day)).RETURN.u
+
+
+def return_string(pypher):
+    return 'MATCH (n)'
+
+
+class CompileManyTests(unittest.TestCase):
+
+    def test_can_compile_callable(self):
+        compiled = compile_item(functools.partial(build_user, 1))
+        cypher, params = compiled
+
+        self.assertIsInstance(compiled, Compiled)
+        self.assertEqual([1], list(params.values()))
+        self.assertEqual('MATCH (u:`User` {{`id`: ${}}}) RETURN u'.format(
+            list(params)[0]), cypher)
+
+    def test_can_compile_returned_pypher(self):
+        cypher, params = compile_item(functools.partial(return_user, 'mark'))
+
+        self.assertEqual(['mark'], list(params.values()))
+        self.assertIn('`name`', cypher)
+
+    def test_can_compile_pypher_and_partial(self):
+        p = Pypher()
+        p.RETURN.u
+        case = Case(__.n.__eyes__).WHEN('"blue"', 1)
+
+        self.assertEqual('RETURN u', compile_item(p).cypher)
+        self.assertEqual('CASE n.`eyes` WHEN "blue" THEN 1 END',
+            compile_item(case).cypher)
+        self.assertEqual(str(case), compile_item(case).cypher)
+
+    def test_cannot_compile_invalid_items(self):
+        with self.assertRaises(PypherArgumentException):
+            compile_item('MATCH (n)')
+
+        with self.assertRaises(PypherArgumentException):
+            compile_item(return_string)
+
+    def test_results_are_in_order(self):
+        items = [functools.partial(build_user, i) for i in range(25)]
+
+        with ThreadPoolExecutor(max_workers=4) as executor:
+            results = list(compile_many(items, workers=4, chunk_size=3,
+                executor=executor))
+
+        self.assertEqual(list(range(25)),
+            [list(params.values())[0] for cypher, params in results])
+
+    def test_items_are_consumed_lazily(self):
+        consumed = []
+
+        def items():
+            for i in range(100):
+                consumed.append(i)
+
+                yield functools.partial(build_user, i)
+
+        with ThreadPoolExecutor(max_workers=1) as executor:
+            results = compile_many(items(), workers=1, chunk_size=5,
+                executor=executor)
+            next(results)
+            results.close()
+
+        self.assertLess(len(consumed), 100)
+
+    def test_can_compile_in_process_pool(self):
+        case = Case(__.n.__eyes__).WHEN('"blue"', 1).ELSE(-1)
+        p = Pypher()
+        p.MATCH.node('n', id=1).RETURN(case)
+        exp = str(p)
+        items = [functools.partial(build_user, i) for i in range(10)]
+        items.append(p)
+        items.append(case)
+        results = list(compile_many(items, workers=2, chunk_size=4))
+
+        self.assertEqual(12, len(results))
+        self.assertEqual(list(range(10)),
+            [list(params.values())[0] for cypher, params in results[:10]])
+        self.assertEqual(exp, results[10].cypher)
+        self.assertEqual(dict(p.bound_params), dict(results[10].params))
+        self.assertEqual(str(case), results[11].cypher)
+
+    def test_can_compile_non_primitive_params_in_process_pool(self):
+        items = [functools.partial(build_signup, i) for i in range(1, 6)]
+        results = list(compile_many(items, workers=2, chunk_size=2))
+
+        self.assertEqual([date(2020, 1, i) for i in range(1, 6)],
+            [list(params.values())[0] for cypher, params in results])
+
+    def test_cannot_use_invalid_chunk_size(self):
+        with self.assertRaises(PypherArgumentException):
+            list(compile_many([], chunk_size=-1))
+
+        with self.assertRaises(PypherArgumentException):
+            list(compile_many([], chunk_size=0))
@@ -1,5 +1,6 @@
 from random import randrange, random
 
+import pickle
 import unittest
 import re
 
@@ -118,6 +119,19 @@ class PartialTests(unittest.TestCase):
         self.assertEqual(2, len(params))
 
 
+    def test_will_rebuild_pypher_with_changed_partial_argument(self):
+        p = Pypher()
+        case = Case(__.n.__eyes__)
+        case.WHEN('"blue"', 1)
+        p.RETURN(case)
+        first = str(p)
+        case.ELSE(3)
+        second = str(p)
+
+        self.assertEqual('RETURN CASE n.`eyes` WHEN "blue" THEN 1 END', first)
+        self.assertEqual(
+            'RETURN CASE n.`eyes` WHEN "blue" THEN 1 ELSE 3 END', second)
+
 class PartialOperatorTests(unittest.TestCase):
 
     def test_can_add_two_partials(self):
@@ -169,6 +183,25 @@ class PartialCaseTests(unittest.TestCase):
 
         self.assertEqual(c, exp)
 
+    def test_can_pickle_case(self):
+        case = Case(__.n.__eyes__)
+        case.WHEN('blue', 1)
+        case.ELSE(3)
+        loaded = pickle.loads(pickle.dumps(case))
+
+        self.assertIsInstance(loaded, Case)
+        self.assertEqual(str(case), str(loaded))
+
+    def test_can_compile_case(self):
+        case = Case(__.n.__eyes__)
+        case.WHEN('blue', 1)
+        cypher, params = case.compile()
+
+        self.assertEqual(str(case), cypher)
+        self.assertEqual('CASE n.`eyes` WHEN blue THEN 1 END', cypher)
+        self.assertEqual({}, dict(params))
+        self.assertEqual(cypher, case.compile().cypher)
+
 
 if __name__ == '__main__':
     unittest.main()